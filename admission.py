@@ -0,0 +1,101 @@
+"""
+Admission control for the chat endpoints.
+
+At most `max_concurrent` turns run at once; up to `max_queue` more wait for a
+slot (for at most `queue_timeout` seconds). Beyond that requests are turned
+away straight away with a Retry-After hint instead of piling up on the worker.
+"""
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 32, queue_timeout: float = 30.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        # Moving average of how long a turn holds a slot, for Retry-After.
+        self._avg_seconds = 5.0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=int(os.getenv("CHAT_MAX_CONCURRENCY", "8")),
+            max_queue=int(os.getenv("CHAT_MAX_QUEUE", "32")),
+            queue_timeout=float(os.getenv("CHAT_QUEUE_TIMEOUT", "30")),
+        )
+
+    def _retry_after(self) -> int:
+        # Time for the queue ahead to drain through the available slots.
+        backlog = self.waiting + self.active
+        return max(1, math.ceil(self._avg_seconds * backlog / self.max_concurrent))
+
+    async def acquire(self) -> float:
+        """Waits for a slot; returns the admission time for `release`.
+
+        Raises Overloaded (429) when the queue is full, or (503) when no slot
+        frees up within the queue timeout.
+        """
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected_queue_full += 1
+                raise Overloaded(429, "Too many requests in queue, try again later.", self._retry_after())
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                raise Overloaded(503, "Server busy, try again later.", self._retry_after())
+            finally:
+                self.waiting -= 1
+        else:
+            # A slot is free: take it without yielding to the event loop.
+            await self._slots.acquire()
+        self.active += 1
+        self.admitted += 1
+        return time.monotonic()
+
+    def release(self, admitted_at: float) -> None:
+        self.active -= 1
+        self._slots.release()
+        self._avg_seconds = 0.9 * self._avg_seconds + 0.1 * (time.monotonic() - admitted_at)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        admitted_at = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(admitted_at)
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_turn_seconds": round(self._avg_seconds, 3),
+        }
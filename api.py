@@ -1,89 +1,371 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from google.adk.runners import InMemoryRunner
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional
 from dotenv import load_dotenv
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+import asyncio
+import json
 import os
+import threading
+import time
+import uuid
 
 # Load env before importing agent
 env_path = os.path.join(os.path.dirname(__file__), 'my_agent', '.env')
 load_dotenv(env_path)
 
-from my_agent.agent import root_agent
+from my_agent.feed import Subscription, job_feed
+from my_agent.pincode_distance import resolve_pincode
+from my_agent.preload import warm
+from my_agent.telemetry import CHAT_SECONDS, RequestTrace, start_trace
+from admission import AdmissionController, Overloaded
+from data_api import router as data_router
 import logging
 
+if TYPE_CHECKING:
+    from google.adk.events import Event
+
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Gig Agent API")
-runner = InMemoryRunner(agent=root_agent)
+# New-job push feed (FEED_POLL_SECONDS, FEED_MAX_SUBSCRIBERS, FEED_QUEUE_SIZE)
+FEED_POLL_SECONDS = float(os.getenv("FEED_POLL_SECONDS", "1.0"))
+FEED_MAX_SUBSCRIBERS = int(os.getenv("FEED_MAX_SUBSCRIBERS", "10000"))
+FEED_KEEPALIVE_SECONDS = 15.0
+
+# GIG_WARM: "startup" (default) loads the data, indexes and agents before the first request
+# is accepted; "background" serves liveness right away and /ready once done; "off" loads on first use.
+WARM_MODE = os.getenv("GIG_WARM", "startup").lower()
+if WARM_MODE not in ("startup", "background", "off"):
+    raise ValueError(f"Unknown GIG_WARM: {WARM_MODE}")
+APP_NAME = "gig_agent"
+
+class AgentRuntime:
+    """The ADK runner and session store. Importing google.adk and building the
+    agent tree takes over a second, so it happens in the warm-up or on the
+    first chat, not when this module is imported."""
+
+    def __init__(self):
+        from google.adk.agents.run_config import RunConfig, StreamingMode, ToolThreadPoolConfig
+        from google.adk.runners import Runner
+        from my_agent.agent import root_agent
+        from sessions import SessionStore, create_session_service
+
+        self.runner = Runner(app_name=APP_NAME, agent=root_agent, session_service=create_session_service())
+        # Bounded per-user sessions (SESSION_BACKEND, SESSION_MAX, SESSION_TTL_SECONDS, SESSION_MAX_MB)
+        self.session_store = SessionStore.from_env(self.runner.session_service, APP_NAME)
+        # Sync tools (file I/O, scans) run on a bounded thread pool instead of the event loop
+        tool_pool = ToolThreadPoolConfig(max_workers=int(os.getenv("TOOL_WORKERS", "8")))
+        self.run_config = RunConfig(tool_thread_pool_config=tool_pool)
+        self.stream_config = RunConfig(streaming_mode=StreamingMode.SSE, tool_thread_pool_config=tool_pool)
+
+_runtime: Optional[AgentRuntime] = None
+_runtime_lock = threading.Lock()
+
+def get_runtime() -> AgentRuntime:
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AgentRuntime()
+    return _runtime
+
+async def _agent_runtime() -> AgentRuntime:
+    # Off the event loop when it still has to be built (GIG_WARM=off, or before warm-up is done)
+    return _runtime or await asyncio.to_thread(get_runtime)
+
+# What /ready reports; seconds per step once warm.
+warm_state: Dict[str, Any] = {"ready": WARM_MODE == "off", "seconds": None, "steps": {}, "error": None}
+
+def warm_up() -> None:
+    """Loads the data, builds the indexes and the agent runtime (blocking)."""
+    start = time.perf_counter()
+    try:
+        steps = warm()
+        agents_start = time.perf_counter()
+        get_runtime()
+        steps["agents"] = time.perf_counter() - agents_start
+    except Exception as e:
+        logger.exception("Warm-up failed")
+        warm_state["error"] = str(e)
+        return
+    warm_state.update(ready=True, seconds=round(time.perf_counter() - start, 3),
+                      steps={name: round(s, 3) for name, s in steps.items()})
+    logger.info("Warm in %.2fs: %s", warm_state["seconds"], warm_state["steps"])
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warming = None
+    if WARM_MODE == "startup":
+        # uvicorn accepts no connections until this returns
+        await asyncio.to_thread(warm_up)
+    elif WARM_MODE == "background":
+        warming = asyncio.ensure_future(asyncio.to_thread(warm_up))
+    # Picks up jobs appended to gig_jobs.csv by other writers; POST /jobs publishes straight away.
+    watcher = asyncio.create_task(job_feed.watch(FEED_POLL_SECONDS))
+    yield
+    watcher.cancel()
+    if warming is not None:
+        await warming
+
+app = FastAPI(title="Gig Agent API", lifespan=lifespan)
+# Direct, LLM-free JSON endpoints: /jobs, /jobs/search, /workers/available, /rates/estimate
+app.include_router(data_router)
+# Bounded concurrency with a wait queue in front of /chat (CHAT_MAX_CONCURRENCY, CHAT_MAX_QUEUE, CHAT_QUEUE_TIMEOUT)
+admission = AdmissionController.from_env()
 
 class QueryRequest(BaseModel):
     text: str
+    user_id: str = "anonymous"
+    # Omit to start a new conversation; send back the returned id to continue it.
+    session_id: Optional[str] = None
+    # Include the per-step timing breakdown (agents, LLM calls, tools) in the response.
+    debug: bool = False
 
 class QueryResponse(BaseModel):
     response: str
+    session_id: str
+    timing: Optional[Dict[str, Any]] = None
+
+def _event_text(e: "Event") -> str:
+    """Text parts of an event's content, joined."""
+    if not e.content or not e.content.parts:
+        return ""
+    return "\n".join(part.text for part in e.content.parts if part.text)
+
+def _final_text(events: List["Event"]) -> str:
+    # The last event with text is the answer the user should see. A turn that
+    # ends in parallel branches (job_briefing) has one last answer per branch.
+    answers: Dict[str, str] = {}
+    parent = None
+    for e in reversed(events):
+        if e.partial:
+            continue
+        text = _event_text(e)
+        if not text:
+            continue
+        if not answers:
+            if not e.branch or "." not in e.branch:
+                return text
+            parent = e.branch.rsplit(".", 1)[0] + "."
+        elif not (e.branch or "").startswith(parent):
+            break
+        answers.setdefault(e.branch, text)
+    return "\n\n".join(reversed(answers.values()))
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request, exc: Overloaded):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail},
+                        headers={"Retry-After": str(exc.retry_after)})
 
 @app.get("/")
 def health_check():
-    return {"status": "ok", "agent": "GigPlatformBrain"}
+    """Liveness: answers as soon as the process serves requests, warm or not."""
+    return {"status": "ok", "agent": "GigPlatformBrain", "ready": warm_state["ready"],
+            "active_sessions": _runtime.session_store.metrics()["active_sessions"] if _runtime else 0,
+            "admission": admission.metrics()}
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness: 503 until the data is loaded and the indexes and agents are built."""
+    if not warm_state["ready"]:
+        return JSONResponse(status_code=503, content={"ready": False, "error": warm_state["error"]})
+    return warm_state
+
+@app.get("/sessions/metrics")
+def session_metrics():
+    return get_runtime().session_store.metrics()
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus histograms for chat requests, agent runs, LLM calls and tool calls."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 @app.post("/chat", response_model=QueryResponse)
-async def chat_endpoint(request: QueryRequest):
+async def chat_endpoint(request: QueryRequest, response: Response):
     logger.info(f"Received Query: {request.text}")
+    session_id = request.session_id or uuid.uuid4().hex
+    trace = start_trace()
+    async with admission.slot():
+        result = await _run_chat(request, session_id)
+    trace.finish()
+    CHAT_SECONDS.labels("chat").observe(trace.elapsed())
+    totals = trace.totals()
+    prompt_before, prompt_after = trace.context_tokens()
+    logger.info("Chat turn took %.2fs (llm %.2fs, tools %.2fs), prompts ~%d tokens (%d before compaction)",
+                totals["total"], totals.get("llm", 0.0), totals.get("tool", 0.0), prompt_after, prompt_before)
+    response.headers["Server-Timing"] = trace.server_timing()
+    if request.debug:
+        result.timing = trace.as_dict()
+    return result
+
+async def _run_chat(request: QueryRequest, session_id: str) -> QueryResponse:
     try:
+        runtime = await _agent_runtime()
         # run_debug returns List[Event]
-        # We use a fixed session_id for now to keep context in this simple demo
-        events = await runner.run_debug(request.text, session_id="demo_session", quiet=True)
-        
-        # Extract text from the last meaningful event
-        # We iterate and concatenate 'text' attributes if they exist
-        output_text = ""
-        for event in events:
-            # We look for simple text content in the events
-            if hasattr(event, 'text') and event.text:
-                # We might want only the final response, but let's grab all model output for now.
-                # Heuristic: If it looks like a final answer.
-                pass
-
-        # Since parsing Event structure blindly is risky, let's rely on print output logic refactored
-        # Or simpler: The last event usually contains the final response text in `content` or `text`.
-        # Let's dump the last event to string if check fails.
-        if events:
-             # Basic heuristic: Search for the last event with 'text'
-             for e in reversed(events):
-                 if hasattr(e, 'text') and e.text:
-                     output_text = e.text
-                     break
-                 if hasattr(e, 'content') and e.content:
-                     # Check if content has 'parts' (common in ADK ModelResponse)
-                     if hasattr(e.content, 'parts'):
-                         parts_text = []
-                         for part in e.content.parts:
-                             if hasattr(part, 'text') and part.text:
-                                 parts_text.append(part.text)
-                         if parts_text:
-                             output_text = "\n".join(parts_text)
-                             break
-                     # Fallback to direct text attribute or string conversion if 'parts' missing but not empty
-                     elif hasattr(e.content, 'text') and e.content.text:
-                         output_text = e.content.text
-                         break
-                     
-                     # If we are here, it might be a weird object, but let's try not to return raw repr
-                     # Only use str() as last resort if it looks like a string
-                     if isinstance(e.content, str):
-                        output_text = e.content
-                        break
+        session_lock = await runtime.session_store.acquire(request.user_id, session_id)
+        try:
+            async with session_lock:
+                events = await runtime.runner.run_debug(request.text, user_id=request.user_id,
+                                                        session_id=session_id, quiet=True,
+                                                        run_config=runtime.run_config)
+            await runtime.session_store.record_turn(request.user_id, session_id, events)
+        finally:
+            runtime.session_store.release(request.user_id, session_id)
         
+        output_text = _final_text(events)
         if not output_text:
             output_text = "No response generated."
 
-        return QueryResponse(response=output_text)
+        return QueryResponse(response=output_text, session_id=session_id)
     except Exception as e:
         logger.error(f"Error processing query: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _ndjson(payload: dict) -> str:
+    return json.dumps(payload, ensure_ascii=False) + "\n"
+
+class ClosingStreamingResponse(StreamingResponse):
+    """Runs `on_close` exactly once when the response is over, however it ends.
+    A generator's own `finally` does not run if the client is gone before the
+    body starts, so resources taken in the handler are released here."""
+
+    def __init__(self, content, on_close: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._on_close()
+
+async def _stream_chat(request: QueryRequest, session_id: str) -> AsyncIterator[str]:
+    """Runs one turn and yields NDJSON progress lines as events arrive.
+
+    Line types: session, text (a chunk of model output), tool_call,
+    tool_result, transfer, done (with the final answer, and the timing
+    breakdown when `debug` is set) and error.
+    """
+    trace = start_trace()
+    try:
+        async for line in _stream_events(request, session_id, trace):
+            yield line
+    finally:
+        trace.finish()
+        CHAT_SECONDS.labels("chat_stream").observe(trace.elapsed())
+
+async def _stream_events(request: QueryRequest, session_id: str, trace: RequestTrace) -> AsyncIterator[str]:
+    yield _ndjson({"type": "session", "session_id": session_id})
+    events: List["Event"] = []
+    streamed_partial = False
+    try:
+        from google.genai import types
+        runtime = await _agent_runtime()
+        session_lock = await runtime.session_store.acquire(request.user_id, session_id)
+        try:
+            async with session_lock:
+                message = types.Content(role="user", parts=[types.Part(text=request.text)])
+                async for event in runtime.runner.run_async(user_id=request.user_id, session_id=session_id,
+                                                            new_message=message, run_config=runtime.stream_config):
+                    events.append(event)
+                    text = _event_text(event)
+                    if event.partial:
+                        streamed_partial = True
+                        if text:
+                            yield _ndjson({"type": "text", "author": event.author, "text": text})
+                        continue
+                    # A non-partial event repeats the chunks already streamed for it.
+                    if text and not streamed_partial:
+                        yield _ndjson({"type": "text", "author": event.author, "text": text})
+                    streamed_partial = False
+                    for call in event.get_function_calls():
+                        yield _ndjson({"type": "tool_call", "author": event.author, "name": call.name, "args": call.args or {}})
+                    for response in event.get_function_responses():
+                        yield _ndjson({"type": "tool_result", "author": event.author, "name": response.name})
+                    if event.actions and event.actions.transfer_to_agent:
+                        yield _ndjson({"type": "transfer", "agent": event.actions.transfer_to_agent})
+            await runtime.session_store.record_turn(request.user_id, session_id, [e for e in events if not e.partial])
+        finally:
+            runtime.session_store.release(request.user_id, session_id)
+        done = {"type": "done", "session_id": session_id,
+                "response": _final_text(events) or "No response generated."}
+        if request.debug:
+            trace.finish()
+            done["timing"] = trace.as_dict()
+        yield _ndjson(done)
+    except Exception as e:
+        logger.error(f"Error streaming query: {e}")
+        yield _ndjson({"type": "error", "detail": str(e)})
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: QueryRequest):
+    """Streams the turn as newline-delimited JSON instead of waiting for the whole agent chain."""
+    logger.info(f"Received Streaming Query: {request.text}")
+    session_id = request.session_id or uuid.uuid4().hex
+    # Admit before the response starts so an overload can still return 429/503
+    admitted_at = await admission.acquire()
+    # The slot is released when the response ends, including before its first byte
+    return ClosingStreamingResponse(_stream_chat(request, session_id), lambda: admission.release(admitted_at),
+                                    media_type="application/x-ndjson")
+
+def _subscribe(trade: str, location: str, radius_km: float) -> Subscription:
+    if len(job_feed) >= FEED_MAX_SUBSCRIBERS:
+        raise Overloaded(503, "Too many job feed subscribers, try again later.", 30)
+    try:
+        return job_feed.subscribe(trade, resolve_pincode(location), radius_km)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid location.")
+
+async def _sse_jobs(sub: Subscription) -> AsyncIterator[str]:
+    yield f": subscribed to {sub.trade} jobs within {sub.radius_km:g} km of {sub.pincode}\n\n"
+    while True:
+        try:
+            message = await asyncio.wait_for(sub.queue.get(), timeout=FEED_KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+            continue
+        yield f"event: job\ndata: {message}\n\n"
+
+@app.get("/jobs/feed")
+async def job_feed_endpoint(trade: str = Query(..., min_length=1), location: str = Query(..., min_length=1),
+                            radius_km: float = Query(10.0, gt=0, le=100)):
+    """Server-sent events: one `job` event per new job of `trade` within `radius_km` of `location`."""
+    sub = _subscribe(trade, location, radius_km)
+    # Unsubscribed when the response ends, including before its first byte
+    return ClosingStreamingResponse(_sse_jobs(sub), lambda: job_feed.unsubscribe(sub),
+                                    media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.websocket("/ws/jobs")
+async def job_feed_websocket(websocket: WebSocket, trade: str = Query(..., min_length=1),
+                             location: str = Query(..., min_length=1),
+                             radius_km: float = Query(10.0, gt=0, le=100)):
+    """Same feed as /jobs/feed, one JSON text message per new job."""
+    try:
+        sub = _subscribe(trade, location, radius_km)
+    except (HTTPException, Overloaded) as e:
+        await websocket.close(code=1008 if isinstance(e, HTTPException) else 1013, reason=str(e.detail))
+        return
+    await websocket.accept()
+    # Nothing is expected from the client; receiving is how a disconnect shows up.
+    closed = asyncio.ensure_future(websocket.receive())
+    try:
+        while True:
+            message = asyncio.ensure_future(sub.queue.get())
+            done, _ = await asyncio.wait({message, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed in done:
+                message.cancel()
+                break
+            await websocket.send_text(message.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        closed.cancel()
+        job_feed.unsubscribe(sub)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
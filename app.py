@@ -1,7 +1,15 @@
+import json
 import streamlit as st
 import requests
 
-API_URL = "http://localhost:1234/chat"
+STREAM_URL = "http://localhost:1234/chat/stream"
+
+TOOL_LABELS = {
+    "search_jobs": "🕵️ Searching jobs...",
+    "list_all_jobs": "🕵️ Listing jobs...",
+    "analyze_historical_rates": "💰 Checking past prices...",
+    "check_worker_availability": "👷 Finding workers...",
+}
 
 st.set_page_config(page_title="Gig Worker AI", page_icon="👷")
 
@@ -42,6 +50,9 @@ with st.sidebar:
 # Chat History
 if "messages" not in st.session_state:
     st.session_state.messages = []
+# Backend conversation id, assigned by the API on the first message
+if "session_id" not in st.session_state:
+    st.session_state.session_id = None
 
 # Display Chat
 for message in st.session_state.messages:
@@ -55,16 +66,42 @@ if prompt := st.chat_input("Ask me anything (e.g., 'Find plumber jobs in Indiran
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    # Bot response
+    # Bot response (streamed: partial text and tool progress render as they arrive)
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            try:
-                response = requests.post(API_URL, json={"text": prompt})
-                if response.status_code == 200:
-                    answer = response.json()["response"]
-                    st.markdown(answer)
-                    st.session_state.messages.append({"role": "assistant", "content": answer})
-                else:
+        status = st.empty()
+        placeholder = st.empty()
+        status.caption("Thinking...")
+        streamed = ""
+        answer = None
+        try:
+            with requests.post(STREAM_URL, json={"text": prompt, "session_id": st.session_state.session_id},
+                               stream=True, timeout=300) as response:
+                if response.status_code != 200:
                     st.error(f"Error: {response.text}")
-            except Exception as e:
-                st.error(f"Connection Failed: {e}")
+                else:
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line:
+                            continue
+                        msg = json.loads(line)
+                        if msg["type"] == "session":
+                            st.session_state.session_id = msg["session_id"]
+                        elif msg["type"] == "text":
+                            streamed += msg["text"]
+                            placeholder.markdown(streamed + " ▌")
+                        elif msg["type"] == "tool_call":
+                            status.caption(TOOL_LABELS.get(msg["name"], f"Running {msg['name']}..."))
+                        elif msg["type"] == "transfer":
+                            # A new agent starts a new answer; keep only its text
+                            streamed = ""
+                            status.caption(f"Handing over to {msg['agent']}...")
+                        elif msg["type"] == "done":
+                            answer = msg["response"]
+                        elif msg["type"] == "error":
+                            st.error(f"Error: {msg['detail']}")
+        except Exception as e:
+            st.error(f"Connection Failed: {e}")
+
+        status.empty()
+        if answer:
+            placeholder.markdown(answer)
+            st.session_state.messages.append({"role": "assistant", "content": answer})
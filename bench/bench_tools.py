@@ -0,0 +1,153 @@
+"""
+Benchmarks the agent tools on synthetic data.
+
+For each scale, generates the CSVs (once, under bench/data/<scale>), points
+the data store at them and reports, per tool: latency percentiles and
+throughput over a mixed query set, plus load/index build time, peak RSS and
+peak allocations during the calls. Tool result caches are cleared before
+every call, so numbers are for cold lookups unless --warm is given.
+
+    python -m bench.bench_tools --scales 10k 100k 1M
+"""
+import argparse
+import gc
+import os
+import random
+import resource
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from my_agent import datastore
+from my_agent.cache import clear_caches
+from my_agent.matching import MODES as MATCH_MODES, match
+from my_agent.pincode_distance import AREA_MAP, get_area_resolver, resolve_pincode
+from my_agent.tools import analyze_historical_rates, check_worker_availability, search_jobs
+
+from .generate_data import PROBLEMS, TRADES, generate, parse_scale
+
+DATA_ROOT = os.path.join(os.path.dirname(__file__), "data")
+
+
+def _queries(rng: random.Random, n: int) -> Dict[str, List[Tuple]]:
+    """Argument tuples per tool: real area names, some misspelled, and a few misses."""
+    areas = list(AREA_MAP)
+    trades = list(TRADES)
+
+    def area() -> str:
+        name = rng.choice(areas)
+        if rng.random() < 0.3 and len(name) > 4:
+            i = rng.randrange(1, len(name) - 1)
+            name = name[:i] + name[i + 1:]  # drop a letter
+        return name
+
+    def keywords(trade: str) -> str:
+        return " ".join(rng.choice(PROBLEMS[trade]).split()[:rng.randint(1, 3)])
+
+    return {
+        "search_jobs": [(t, area(), rng.choice([5.0, 10.0, 20.0]))
+                        for t in rng.choices(trades, k=n)],
+        "check_worker_availability": [(t, area()) for t in rng.choices(trades, k=n)],
+        "analyze_historical_rates": [(t, keywords(t)) for t in rng.choices(trades, k=n)],
+        "resolve_pincode": [(area(),) for _ in range(n)],
+    }
+
+
+TOOLS: Dict[str, Callable[..., object]] = {
+    "search_jobs": search_jobs,
+    "check_worker_availability": check_worker_availability,
+    "analyze_historical_rates": analyze_historical_rates,
+    "resolve_pincode": resolve_pincode,
+}
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _time_calls(fn: Callable[..., object], calls: List[Tuple], warm: bool) -> List[float]:
+    latencies = []
+    for args in calls:
+        if not warm:
+            clear_caches()
+            get_area_resolver().cache_clear()
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _load() -> None:
+    """Loads the tables and builds every index the tools use."""
+    datastore.get_jobs(), datastore.get_history(), datastore.get_workers()
+    search_jobs("Plumber", "Indiranagar")
+    check_worker_availability("Plumber", "Indiranagar")
+    analyze_historical_rates("Plumber", "leak")
+
+
+def bench_scale(scale: str, calls: int, warm: bool, seed: int) -> None:
+    rows = parse_scale(scale)
+    data_dir = os.path.join(DATA_ROOT, scale)
+    if not os.path.exists(os.path.join(data_dir, "worker_profiles.csv")):
+        start = time.perf_counter()
+        generate(data_dir, rows, max(rows // 10, 1), seed)
+        print(f"[{scale}] generated data in {time.perf_counter() - start:.1f}s")
+    datastore.set_data_dir(data_dir)
+    clear_caches()
+    gc.collect()
+
+    start = time.perf_counter()
+    _load()
+    load_seconds = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux; scales run smallest first, so this is this scale's peak
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n[{scale}] {rows} jobs/history rows, {len(datastore.get_workers())} workers: "
+          f"load + index build {load_seconds:.2f}s, peak RSS {peak_rss:.0f} MiB")
+
+    queries = _queries(random.Random(seed), calls)
+    print(f"{'tool':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'calls/s':>10}")
+    for name, fn in TOOLS.items():
+        latencies = sorted(_time_calls(fn, queries[name], warm))
+        ms = [v * 1000 for v in latencies]
+        throughput = len(latencies) / sum(latencies) if sum(latencies) else float("inf")
+        print(f"{name:<28}{_percentile(ms, 0.5):>10.3f}{_percentile(ms, 0.95):>10.3f}"
+              f"{_percentile(ms, 0.99):>10.3f}{ms[-1]:>10.3f}{throughput:>10.0f}")
+    # Peak Python allocations of the calls themselves (tracemalloc is slow, so a tenth of the calls)
+    tracemalloc.start()
+    for name, fn in TOOLS.items():
+        _time_calls(fn, queries[name][:max(calls // 10, 1)], warm)
+    _, call_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"peak memory during calls: {call_peak / 2**20:.1f} MiB")
+    _bench_matching()
+
+
+def _bench_matching(max_jobs: int = 10_000) -> None:
+    """One batch assignment of up to `max_jobs` open jobs to all available workers, per mode."""
+    jobs = datastore.get_jobs().records[:max_jobs]
+    workers = datastore.get_workers().records
+    for mode in MATCH_MODES:
+        start = time.perf_counter()
+        result = match(jobs, workers, mode)
+        print(f"match {mode:<8} {len(jobs)} jobs x {len(workers)} workers: {time.perf_counter() - start:.2f}s, "
+              f"{len(result.assignments)} assigned, {result.total_distance_km:.0f} km total")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["10k", "100k", "1M"])
+    parser.add_argument("--calls", type=int, default=200, help="calls per tool at each scale")
+    parser.add_argument("--warm", action="store_true", help="keep result caches between calls")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    for scale in args.scales:
+        bench_scale(scale, args.calls, args.warm, args.seed)
+
+
+if __name__ == "__main__":
+    main()
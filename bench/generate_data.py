@@ -0,0 +1,163 @@
+"""
+Synthetic data generator for benchmarks.
+
+Writes `gig_jobs.csv`, `historical_jobs.csv` and `worker_profiles.csv` with the
+same columns as the files in `my_agent/`, at any scale. Pincodes follow a
+Zipf-like popularity over the mapped Bangalore pincodes (plus a few unmapped
+'56xxxx' codes), and trades follow the mix of the sample data.
+
+    python -m bench.generate_data --rows 100000 --out bench/data/100k
+"""
+import argparse
+import csv
+import math
+import os
+import random
+from typing import Dict, List, Sequence, Tuple
+
+from my_agent.pincode_distance import AREA_MAP, PINCODE_COORDS
+
+# Trade mix roughly as in the sample CSVs.
+TRADES: Dict[str, float] = {
+    "Plumber": 0.22, "Electrician": 0.22, "Carpenter": 0.14, "AC Repair": 0.12,
+    "Maid": 0.12, "Painter": 0.10, "Civil": 0.08,
+}
+
+PROBLEMS: Dict[str, List[str]] = {
+    "Plumber": ["Kitchen sink pipe leaking", "Bathroom drain completely blocked", "Tap washer replacement",
+                "Water tank overflow", "Geyser not heating water", "Toilet flush not working",
+                "Main line leak under floor", "RO purifier installation"],
+    "Electrician": ["Ceiling fan making noise", "MCB keeps tripping", "New switch board installation",
+                    "Complete house rewiring", "Inverter connection", "Light fitting replacement",
+                    "Earthing problem in kitchen", "Doorbell not working"],
+    "Carpenter": ["Wardrobe door hinge broken", "Custom wardrobe assembly", "Bed frame repair creaking",
+                  "Kitchen cabinet installation", "Door lock replacement", "Antique furniture restoration"],
+    "AC Repair": ["AC gas filling", "AC water leakage inside room", "AC service and cleaning",
+                  "AC installation split unit", "AC making loud noise", "AC not cooling"],
+    "Maid": ["Deep cleaning for 3BHK", "Bathroom cleaning acid wash", "Kitchen chimney cleaning",
+             "Balcony and window glass cleaning", "Daily cooking help"],
+    "Painter": ["Full 2BHK interior painting", "Wall dampness treatment", "Texture painting living room",
+                "Exterior wall painting", "Wood polish for doors"],
+    "Civil": ["Balcony waterproofing", "Convert indian toilet to western", "Tile replacement in bathroom",
+              "Building small ramp", "Compound wall crack repair"],
+}
+
+# Typical final rate (median, in rupees) per trade; rates are log-normal around it.
+BASE_RATE: Dict[str, float] = {
+    "Plumber": 1200, "Electrician": 1500, "Carpenter": 1000, "AC Repair": 1300,
+    "Maid": 1500, "Painter": 4000, "Civil": 6000,
+}
+
+URGENCY = (["High", "Medium", "Low"], [0.3, 0.45, 0.25])
+EXPERTISE = (["Novice", "Moderate", "Expert", "Elite"], [0.2, 0.4, 0.3, 0.1])
+FIRST_NAMES = ["Ramesh", "Suresh", "Anil", "Manjunath", "Ravi", "Abdul", "Ganesh", "Venkatesh", "Arun",
+               "Lakshmi", "Kavya", "Deepak", "Mohan", "Naveen", "Shankar", "Imran", "Prakash", "Babu"]
+SURNAME_INITIALS = "ABCDGHKLMNPRSTV"
+SKILLS: Dict[str, List[str]] = {
+    "Plumber": ["Leak Detection", "Pipe Fitting", "Drainage", "Bathroom Fittings"],
+    "Electrician": ["Wiring", "Invertors", "Fittings", "Panels"],
+    "Carpenter": ["Cabinets", "Repair", "Polishing", "Assembly"],
+    "AC Repair": ["Gas Filling", "Servicing", "Installation"],
+    "Maid": ["Deep Cleaning", "Cooking", "Laundry"],
+    "Painter": ["Interior", "Texture", "Waterproofing"],
+    "Civil": ["Tiling", "Demolition", "Concrete", "Waterproofing"],
+}
+
+HEADERS = {
+    "gig_jobs.csv": ["job_id", "required_trade", "location_zip", "area", "contact_number",
+                     "problem_description", "urgency_level"],
+    "historical_jobs.csv": ["historical_id", "trade", "job_description", "location_zip", "area", "labor_hours",
+                            "material_cost", "final_rate_charged", "difficulty_score", "worker_id",
+                            "customer_review_text"],
+    "worker_profiles.csv": ["worker_id", "name", "trade", "experience_years", "skill_tags", "service_area_zip",
+                            "area", "base_hourly_rate", "rating_average", "is_available", "verified_badge",
+                            "expertise_level"],
+}
+
+UNMAPPED_PINCODES = ["560075", "560068", "560085", "560099"]
+
+
+def _pincode_sampler(rng: random.Random) -> Tuple[List[str], List[float], Dict[str, str]]:
+    """Pincodes with Zipf-like weights, and an area name for each."""
+    pincodes = list(PINCODE_COORDS)
+    rng.shuffle(pincodes)
+    pincodes += UNMAPPED_PINCODES
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(pincodes))]
+    areas: Dict[str, str] = {}
+    for name, pincode in AREA_MAP.items():
+        areas.setdefault(pincode, name.title())
+    return pincodes, weights, {p: areas.get(p, "Bangalore") for p in pincodes}
+
+
+def _choices(rng: random.Random, population: Sequence, weights: Sequence[float], k: int) -> List:
+    return rng.choices(population, weights=weights, k=k)
+
+
+def generate(out_dir: str, rows: int, workers: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    pincodes, pin_weights, area_of = _pincode_sampler(rng)
+    trades, trade_weights = list(TRADES), list(TRADES.values())
+
+    with open(os.path.join(out_dir, "gig_jobs.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(HEADERS["gig_jobs.csv"])
+        job_trades = _choices(rng, trades, trade_weights, rows)
+        job_pins = _choices(rng, pincodes, pin_weights, rows)
+        job_urgency = _choices(rng, *URGENCY, rows)
+        for i in range(rows):
+            trade, pincode = job_trades[i], job_pins[i]
+            w.writerow([f"J{100000 + i}", trade, pincode, area_of[pincode], f"98{rng.randrange(10**8):08d}",
+                        rng.choice(PROBLEMS[trade]), job_urgency[i]])
+
+    worker_ids = [f"W{100000 + i}" for i in range(workers)]
+    with open(os.path.join(out_dir, "historical_jobs.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(HEADERS["historical_jobs.csv"])
+        hist_trades = _choices(rng, trades, trade_weights, rows)
+        hist_pins = _choices(rng, pincodes, pin_weights, rows)
+        for i in range(rows):
+            trade, pincode = hist_trades[i], hist_pins[i]
+            rate = round(BASE_RATE[trade] * math.exp(rng.gauss(0, 0.6)), -1)
+            difficulty = min(10, max(1, int(round(math.log(rate / 100) * 1.5))))
+            w.writerow([f"H{100000 + i}", trade, rng.choice(PROBLEMS[trade]), pincode, area_of[pincode],
+                        round(rng.uniform(0.5, 8.0), 1), round(rate * rng.uniform(0, 0.4), -1), rate,
+                        difficulty, rng.choice(worker_ids) if worker_ids else "", "Good work"])
+
+    with open(os.path.join(out_dir, "worker_profiles.csv"), "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(HEADERS["worker_profiles.csv"])
+        worker_trades = _choices(rng, trades, trade_weights, workers)
+        worker_pins = _choices(rng, pincodes, pin_weights, workers)
+        levels = _choices(rng, *EXPERTISE, workers)
+        for i in range(workers):
+            trade, pincode = worker_trades[i], worker_pins[i]
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAME_INITIALS)}"
+            skills = ",".join(rng.sample(SKILLS[trade], k=min(2, len(SKILLS[trade]))))
+            w.writerow([worker_ids[i], name, trade, rng.randint(1, 25), skills, pincode, area_of[pincode],
+                        rng.choice([150, 200, 250, 300, 350, 400, 450, 500]), round(rng.uniform(3.5, 5.0), 1),
+                        rng.random() < 0.6, rng.random() < 0.5, levels[i]])
+
+
+def parse_scale(value: str) -> int:
+    """'10k' -> 10000, '1M' -> 1000000."""
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10k", help="jobs and history rows, e.g. 10k, 100k, 1M")
+    parser.add_argument("--workers", default=None, help="worker rows (default: rows / 10)")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    rows = parse_scale(args.rows)
+    workers = parse_scale(args.workers) if args.workers else max(rows // 10, 1)
+    generate(args.out, rows, workers, args.seed)
+    print(f"Wrote {rows} jobs, {rows} history rows, {workers} workers to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
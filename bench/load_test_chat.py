@@ -0,0 +1,105 @@
+"""
+End-to-end load test of the /chat endpoint with a stub model.
+
+Runs `api.app` in-process over an ASGI transport with every agent's model
+swapped for `bench.stub_model.StubLlm`, so each request goes through the
+real admission control, session store, runner, agent transfer and tool call
+without any network access. Reports latency percentiles, throughput and
+response status counts.
+
+    python -m bench.load_test_chat --requests 500 --concurrency 16
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from typing import List
+
+import httpx
+
+from my_agent import datastore
+
+from .bench_tools import _percentile
+from .stub_model import install
+
+MESSAGES = [
+    "Any plumber jobs in Indiranagar?",
+    "Show me electrician work near Hebbal",
+    "Is a carpenter available in Jayanagar?",
+    "Which AC Repair workers are free near Whitefield?",
+    "What does a painter charge for interior painting?",
+    "Estimate the cost of a bathroom leak for a plumber",
+    "Civil jobs near Koramangala",
+    "Maid available in BTM Layout?",
+]
+
+
+async def _client_loop(client: httpx.AsyncClient, queue: "asyncio.Queue[int]", turns_per_session: int,
+                       rng: random.Random, latencies: List[float], statuses: Counter) -> None:
+    session_id = None
+    turns = 0
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        if turns == turns_per_session:
+            session_id, turns = None, 0
+        payload = {"text": rng.choice(MESSAGES), "user_id": f"load-{id(rng)}", "session_id": session_id}
+        start = time.perf_counter()
+        response = await client.post("/chat", json=payload)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+        if response.status_code == 200:
+            session_id = response.json()["session_id"]
+            turns += 1
+
+
+async def run(requests: int, concurrency: int, turns_per_session: int, model_delay: float, seed: int) -> None:
+    import api  # after the data dir is set, so the app loads the right files
+
+    install(api.get_runtime().runner.agent, delay=model_delay)
+    logging.getLogger().setLevel(logging.WARNING)  # api logs every query at INFO
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # One warm-up turn loads the data and builds the indexes
+        await client.post("/chat", json={"text": MESSAGES[0]})
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for i in range(requests):
+            queue.put_nowait(i)
+        latencies: List[float] = []
+        statuses: Counter = Counter()
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _client_loop(client, queue, turns_per_session, random.Random(seed + i), latencies, statuses)
+            for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        metrics = (await client.get("/")).json()
+
+    ms = sorted(v * 1000 for v in latencies)
+    print(f"{requests} requests, concurrency {concurrency}, model delay {model_delay * 1000:.0f} ms")
+    print(f"throughput: {len(ms) / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(f"latency ms: p50 {_percentile(ms, 0.5):.1f}  p95 {_percentile(ms, 0.95):.1f}  "
+          f"p99 {_percentile(ms, 0.99):.1f}  max {ms[-1]:.1f}")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+    print(f"server: {metrics}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8, help="simulated users sending turns back to back")
+    parser.add_argument("--turns-per-session", type=int, default=3)
+    parser.add_argument("--model-delay", type=float, default=0.0, help="seconds per stub model call")
+    parser.add_argument("--data-dir", default=None, help="CSV directory, e.g. bench/data/100k")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    if args.data_dir:
+        datastore.set_data_dir(args.data_dir)
+    asyncio.run(run(args.requests, args.concurrency, args.turns_per_session, args.model_delay, args.seed))
+
+
+if __name__ == "__main__":
+    main()
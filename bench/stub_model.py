@@ -0,0 +1,103 @@
+"""
+Offline stand-in for Gemini, for load tests.
+
+`StubLlm` plays a fixed script that exercises the same orchestration path as
+a real turn: the root agent transfers to a sub-agent picked from keywords in
+the user's message (a job id picks the parallel job briefing), the sub-agent
+calls its tool once, and then answers with the start of the tool output. An
+optional delay per model call simulates model latency.
+"""
+import asyncio
+import re
+from typing import AsyncGenerator, Dict, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+TRADES = ("Plumber", "Electrician", "Carpenter", "AC Repair", "Maid", "Painter", "Civil")
+DEFAULT_AREA = "Indiranagar"
+
+
+def _route(text: str) -> str:
+    lowered = text.lower()
+    if re.search(r"\bj\d{3,}\b", lowered):
+        return "job_briefing"
+    if re.search(r"\b(price|cost|rate|charge)", lowered):
+        return "pricing_analyst"
+    if re.search(r"\b(worker|available|free|hire)", lowered):
+        return "worker_manager"
+    return "job_finder"
+
+
+def _tool_call(tool: str, text: str) -> Dict[str, object]:
+    """Arguments for `tool` read off the user's message ('plumber ... in hebbal')."""
+    trade = next((t for t in TRADES if t.lower() in text.lower()), "Plumber")
+    match = re.search(r"\b(?:in|near|at)\s+([a-z ]+?)\s*[?.!]*$", text, re.IGNORECASE)
+    area = match.group(1) if match else DEFAULT_AREA
+    if tool == "search_jobs":
+        return {"category": trade, "location_query": area}
+    if tool == "check_worker_availability":
+        return {"trade": trade, "pincode": area}
+    if tool == "analyze_historical_rates":
+        return {"trade": trade, "description_keywords": text}
+    return {}
+
+
+def _reply(llm_request: LlmRequest, part: types.Part) -> LlmResponse:
+    # Rough token counts (4 characters a token) so usage metrics have something to record
+    prompt_chars = sum(len(p.text or "") for c in llm_request.contents for p in (c.parts or []))
+    return LlmResponse(
+        content=types.Content(role="model", parts=[part]),
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_chars // 4 + 1,
+            candidates_token_count=len(part.text or "") // 4 + 1,
+            total_token_count=(prompt_chars + len(part.text or "")) // 4 + 2))
+
+
+class StubLlm(BaseLlm):
+    model: str = "stub"
+    delay: float = 0.0
+
+    async def generate_content_async(self, llm_request: LlmRequest,
+                                     stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        user_text = _last_user_text(llm_request) or ""
+        last = llm_request.contents[-1] if llm_request.contents else None
+        parts = last.parts if last and last.parts else []
+        responses = [p.function_response for p in parts if p.function_response]
+        if responses:
+            result = str((responses[0].response or {}).get("result", ""))
+            yield _reply(llm_request, types.Part(text=result[:200] or "Done."))
+            return
+        tools = llm_request.tools_dict
+        if "transfer_to_agent" in tools and not any(
+                name in tools for name in ("search_jobs", "check_worker_availability", "analyze_historical_rates")):
+            yield _reply(llm_request, types.Part(function_call=types.FunctionCall(
+                name="transfer_to_agent", args={"agent_name": _route(user_text)})))
+            return
+        for tool in ("search_jobs", "check_worker_availability", "analyze_historical_rates"):
+            if tool in tools:
+                yield _reply(llm_request, types.Part(function_call=types.FunctionCall(
+                    name=tool, args=_tool_call(tool, user_text))))
+                return
+        yield _reply(llm_request, types.Part(text="How can I help?"))
+
+
+def _last_user_text(llm_request: LlmRequest) -> Optional[str]:
+    for content in reversed(llm_request.contents):
+        text = content.parts[0].text if content.parts else None
+        # Skip other agents' turns, which ADK replays to a sub-agent as "For context: ..."
+        if content.role == "user" and text and not text.startswith("For context:"):
+            return text
+    return None
+
+
+def install(agent, delay: float = 0.0) -> None:
+    """Swaps the model of `agent` and all its sub-agents for the stub."""
+    if hasattr(agent, "model"):  # not workflow agents
+        agent.model = StubLlm(delay=delay)
+    for sub_agent in agent.sub_agents:
+        install(sub_agent, delay)
@@ -0,0 +1,264 @@
+"""
+Structured JSON endpoints backed by the agent tools' logic.
+
+These answer deterministic queries (job search, worker availability, rate
+estimates) directly, without going through the LLM agents.
+"""
+from dataclasses import asdict
+from typing import Generic, List, Optional, TypeVar
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from my_agent.cache import cache_stats
+from my_agent.feed import job_feed
+from my_agent.pincode_distance import resolve_pincode
+from my_agent.rates import RateStats, get_rate_engine
+from my_agent.datastore import Job, Worker, get_jobs, set_worker_availability, upsert_jobs, upsert_workers
+from my_agent.tools import (
+    JOB_SORT_KEYS,
+    MATCH_MODES,
+    WORKER_SORT_KEYS,
+    estimate_job_rates,
+    find_available_workers,
+    find_jobs,
+    find_similar_jobs,
+    match_open_jobs,
+    rank_jobs,
+    rank_workers,
+)
+
+router = APIRouter(tags=["data"])
+
+T = TypeVar("T")
+
+
+class RateRange(BaseModel):
+    min: float
+    max: float
+    avg: float
+    count: int
+
+    @classmethod
+    def from_stats(cls, stats: Optional[RateStats]) -> Optional["RateRange"]:
+        if not stats:
+            return None
+        return cls(min=stats.low, max=stats.high, avg=round(stats.mean, 2), count=stats.count)
+
+
+class JobItem(BaseModel):
+    job_id: str
+    required_trade: str
+    location_zip: str
+    area: str
+    contact_number: str
+    problem_description: str
+    urgency_level: str
+    distance_km: Optional[float] = None
+    estimated_rate: Optional[RateRange] = None
+
+
+class JobIn(BaseModel):
+    job_id: str = Field(..., min_length=1)
+    required_trade: str = Field(..., min_length=1)
+    location_zip: str
+    area: str = "Unknown Area"
+    contact_number: str = "N/A"
+    problem_description: str = ""
+    urgency_level: str = "Normal"
+
+
+class WorkerIn(BaseModel):
+    worker_id: str = Field(..., min_length=1)
+    name: str
+    trade: str = Field(..., min_length=1)
+    experience_years: int = 0
+    skill_tags: str = ""
+    service_area_zip: str
+    area: str = ""
+    base_hourly_rate: float = 0.0
+    rating_average: float = 0.0
+    is_available: bool = True
+    verified_badge: bool = False
+    expertise_level: str = ""
+
+
+class Availability(BaseModel):
+    available: bool
+
+
+class Ingested(BaseModel):
+    upserted: int
+
+
+class WorkerItem(BaseModel):
+    worker_id: str
+    name: str
+    trade: str
+    experience_years: int
+    skill_tags: str
+    service_area_zip: str
+    area: str
+    base_hourly_rate: float
+    rating_average: float
+    is_available: bool
+    verified_badge: bool
+    expertise_level: str
+    distance_km: float
+
+
+class HistoricalItem(BaseModel):
+    historical_id: str
+    trade: str
+    job_description: str
+    location_zip: str
+    area: str
+    labor_hours: float
+    material_cost: float
+    final_rate_charged: float
+    difficulty_score: int
+    worker_id: str
+    customer_review_text: str
+
+
+class Page(BaseModel, Generic[T]):
+    total: int
+    offset: int
+    limit: int
+    items: List[T]
+
+
+class JobPage(Page[JobItem]):
+    resolved_pincode: Optional[str] = None
+
+
+class WorkerPage(Page[WorkerItem]):
+    resolved_pincode: str
+
+
+class AssignmentItem(BaseModel):
+    job: JobItem
+    worker: WorkerItem
+    cost: float
+
+
+class MatchPage(Page[AssignmentItem]):
+    mode: str
+    unassigned_job_ids: List[str]
+    idle_workers: int
+    total_distance_km: float
+
+
+class RateEstimate(BaseModel):
+    trade: str
+    matches: int
+    similar_jobs: List[HistoricalItem]
+    similar_range: RateRange
+    trade_median: Optional[float] = None
+    trade_p25: Optional[float] = None
+    trade_p75: Optional[float] = None
+
+
+def _round_km(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+@router.get("/jobs", response_model=Page[JobItem])
+def list_jobs(limit: int = Query(50, ge=1, le=500), offset: int = Query(0, ge=0)):
+    records = get_jobs().records
+    return Page[JobItem](total=len(records), offset=offset, limit=limit,
+                         items=[JobItem(**asdict(job)) for job in records[offset:offset + limit]])
+
+
+@router.get("/jobs/search", response_model=JobPage)
+def search_jobs_endpoint(category: str = Query(..., min_length=1), location: Optional[str] = None,
+                         range_km: float = Query(20.0, gt=0),
+                         limit: int = Query(20, ge=1, le=200), offset: int = Query(0, ge=0),
+                         sort: str = Query("distance", pattern=f"^({'|'.join(JOB_SORT_KEYS)})$")):
+    results = find_jobs(category, location, range_km)
+    page = rank_jobs(results, sort, offset + limit)[offset:]
+    # Rate estimates only for the rows being returned
+    estimates = estimate_job_rates([job for job, _ in page])
+    items = [JobItem(**asdict(job), distance_km=_round_km(dist), estimated_rate=RateRange.from_stats(stats))
+             for (job, dist), stats in zip(page, estimates)]
+    return JobPage(total=len(results), offset=offset, limit=limit, items=items,
+                   resolved_pincode=resolve_pincode(location) if location else None)
+
+
+@router.get("/workers/available", response_model=WorkerPage)
+def available_workers_endpoint(trade: str = Query(..., min_length=1), location: str = Query(..., min_length=1),
+                               limit: int = Query(20, ge=1, le=200), offset: int = Query(0, ge=0),
+                               sort: Optional[str] = Query(None, pattern=f"^({'|'.join(WORKER_SORT_KEYS)})$")):
+    resolved_pincode = resolve_pincode(location)
+    if not resolved_pincode:
+        raise HTTPException(status_code=422, detail="Invalid location.")
+    available = find_available_workers(trade, resolved_pincode)
+    page = rank_workers(available, sort, offset + limit)[offset:]
+    items = [WorkerItem(**asdict(w), distance_km=round(dist, 2)) for w, dist in page]
+    return WorkerPage(total=len(available), offset=offset, limit=limit, items=items,
+                      resolved_pincode=resolved_pincode)
+
+
+@router.get("/match", response_model=MatchPage)
+def match_endpoint(trade: Optional[str] = None,
+                   mode: str = Query("greedy", pattern=f"^({'|'.join(MATCH_MODES)})$"),
+                   max_km: float = Query(15.0, gt=0),
+                   limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """Every open job (of `trade`, if given) assigned at most one available worker."""
+    result = match_open_jobs(trade, mode, max_km)
+    items = [AssignmentItem(job=JobItem(**asdict(a.job), distance_km=_round_km(a.distance_km)),
+                            worker=WorkerItem(**asdict(a.worker), distance_km=round(a.distance_km, 2)),
+                            cost=round(a.cost, 4))
+             for a in result.assignments[offset:offset + limit]]
+    return MatchPage(total=len(result.assignments), offset=offset, limit=limit, items=items, mode=mode,
+                     unassigned_job_ids=[job.job_id for job in result.unassigned_jobs],
+                     idle_workers=result.idle_workers,
+                     total_distance_km=round(result.total_distance_km, 2))
+
+
+@router.get("/rates/estimate", response_model=RateEstimate)
+def rate_estimate_endpoint(trade: str = Query(..., min_length=1), keywords: str = "",
+                           top_k: int = Query(5, ge=1, le=100), area: Optional[str] = None,
+                           min_difficulty: Optional[int] = None, max_difficulty: Optional[int] = None):
+    similar, total = find_similar_jobs(trade, keywords, top_k, area, min_difficulty, max_difficulty)
+    if not similar:
+        raise HTTPException(status_code=404, detail=f"No historical data found for {trade} matching '{keywords}'.")
+    trade_stats = get_rate_engine().trade_stats(trade)
+    return RateEstimate(
+        trade=trade,
+        matches=total,
+        similar_jobs=[HistoricalItem(**asdict(h)) for h in similar],
+        similar_range=RateRange.from_stats(RateStats.of(h.final_rate_charged for h in similar)),
+        trade_median=trade_stats.quantile(0.5) if trade_stats else None,
+        trade_p25=trade_stats.quantile(0.25) if trade_stats else None,
+        trade_p75=trade_stats.quantile(0.75) if trade_stats else None,
+    )
+
+
+@router.post("/jobs", response_model=Ingested)
+def ingest_jobs_endpoint(jobs: List[JobIn]):
+    """Adds incoming jobs; a job_id that already exists is replaced. New jobs
+    go out to the matching job feed subscribers right away."""
+    upserted = upsert_jobs(Job(**job.model_dump()) for job in jobs)
+    job_feed.check()
+    return Ingested(upserted=upserted)
+
+
+@router.post("/workers", response_model=Ingested)
+def ingest_workers_endpoint(workers: List[WorkerIn]):
+    """Adds worker profiles; a worker_id that already exists is replaced."""
+    return Ingested(upserted=upsert_workers(
+        Worker(**{**w.model_dump(), "area": w.area or w.service_area_zip}) for w in workers))
+
+
+@router.put("/workers/{worker_id}/availability", response_model=Availability)
+def worker_availability_endpoint(worker_id: str, body: Availability):
+    if not set_worker_availability(worker_id, body.available):
+        raise HTTPException(status_code=404, detail=f"No worker {worker_id}.")
+    return body
+
+
+@router.get("/cache/stats")
+def cache_stats_endpoint():
+    """Hit/miss counters and sizes of the tool result caches."""
+    return cache_stats()
@@ -1 +1,7 @@
-from . import agent
+def __getattr__(name):
+    # The agent tree (and google.adk with it) loads on first use, not with
+    # every module of this package; the data API and warm-up don't need it.
+    if name == "agent":
+        from . import agent
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,9 @@
 from google.adk.agents.llm_agent import Agent
-from .tools import search_jobs, analyze_historical_rates, check_worker_availability, list_all_jobs
+from google.adk.agents.parallel_agent import ParallelAgent
+from .compaction import install as install_compaction
+from .telemetry import instrument
+from .tools import (search_jobs, search_jobs_multi, analyze_historical_rates, check_worker_availability,
+                    list_all_jobs, assign_workers_to_jobs, describe_job)
 
 # --- Sub-Agents ---
 
@@ -11,12 +15,16 @@ job_finder_agent = Agent(
         "You find jobs in `gig_jobs.csv`. Use `search_jobs(category, location_query)`. "
         "RULES:\n"
         "1. CORRECT SPELLING: If user says 'plumbinng', search 'Plumber'. 'carpernter' -> 'Carpenter'.\n"
-        "2. If user lists multiple, search for EACH one separately (e.g. search 'Plumber', then search 'Carpenter').\n"
+        "2. If user lists multiple trades or areas, search them ALL in ONE call with "
+        "`search_jobs_multi(categories, location_queries)` (e.g. ['Plumber', 'Carpenter'], ['Hebbal']).\n"
         "3. LOCATION REQUIRED: If user says 'near me', 'Bangalore', or 'Bengaluru' WITHOUT a specific Area Name, you MUST ASK: 'Which area in Bangalore?' (e.g. Indiranagar, Hebbal).\n"
         "4. ONLY search without location if user explicitly says 'anywhere' or 'all locations'.\n"
-        "5. Support 'anywhere' search. Report Urgency Level."
+        "5. Support 'anywhere' search. Report Urgency Level.\n"
+        "6. Results come a page at a time: if the tool says more were not shown and the user wants them, "
+        "call it again with the given `offset`. Use `sort_by='urgency'` for urgent jobs first, "
+        "`sort_by='rate'` for the best paying."
     ),
-    tools=[search_jobs, list_all_jobs]
+    tools=[search_jobs, search_jobs_multi, list_all_jobs]
 )
 
 pricing_analyst_agent = Agent(
@@ -26,6 +34,7 @@ pricing_analyst_agent = Agent(
     instruction=(
         "You determine fair prices using HISTORICAL data. "
         "Use `analyze_historical_rates(trade, description_keywords)` to find what similar jobs actually cost in the past. "
+        "If the user names an area or how complex the job is, pass `area` or `min_difficulty`/`max_difficulty` (1-10). "
         "Do not just guess. Cite the 'Similar Job' found."
     ),
     tools=[analyze_historical_rates]
@@ -37,9 +46,57 @@ worker_manager_agent = Agent(
     description='Manages worker availability.',
     instruction=(
         "Find available workers using `check_worker_availability(trade, pincode)`. "
-        "Recommend workers based on Rating and Expertise (Elite/Expert)."
+        "Pass `sort_by='rating'` to get the best rated first. "
+        "Recommend workers based on Rating and Expertise (Elite/Expert). "
+        "To staff ALL open jobs at once (e.g. a dispatcher at shift start), use `assign_workers_to_jobs` "
+        "instead of checking jobs one by one."
     ),
-    tools=[check_worker_availability]
+    tools=[check_worker_availability, assign_workers_to_jobs]
+)
+
+# --- Job Briefing: pricing and staffing of a picked job, run side by side ---
+
+def _load_selected_job(callback_context):
+    """Puts the details of the job picked in this conversation into state for the branches."""
+    job_id = callback_context.state.get("gig_job_id")
+    summary = describe_job(job_id) if job_id else None
+    if summary and callback_context.state.get("gig_job") != summary:
+        callback_context.state["gig_job"] = summary
+
+job_pricing_agent = Agent(
+    model='gemini-2.5-flash',
+    name='job_pricing',
+    description='Prices the job the user picked from history.',
+    instruction=(
+        "The user picked this job: {gig_job?}\n"
+        "Estimate what it should pay with `analyze_historical_rates(trade, description_keywords)` "
+        "using its trade and problem. Cite the 'Similar Job' found. Answer in a few lines, price only."
+    ),
+    tools=[analyze_historical_rates],
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+)
+
+job_staffing_agent = Agent(
+    model='gemini-2.5-flash',
+    name='job_staffing',
+    description='Finds workers for the job the user picked.',
+    instruction=(
+        "The user picked this job: {gig_job?}\n"
+        "Find who can do it with `check_worker_availability(trade, pincode, sort_by='rating', compact=True)` "
+        "using its trade and pincode. Recommend the best 3 by Rating and Expertise. Workers only."
+    ),
+    tools=[check_worker_availability],
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True,
+)
+
+# Both branches run concurrently, so the turn takes as long as the slower one.
+job_briefing_agent = ParallelAgent(
+    name='job_briefing',
+    description='Once a job is picked: prices it AND finds workers for it at the same time.',
+    sub_agents=[job_pricing_agent, job_staffing_agent],
+    before_agent_callback=_load_selected_job,
 )
 
 # --- Root Agent ---
@@ -53,9 +110,17 @@ root_agent = Agent(
         "Capabilities:\n"
         "1. Jobs: Ask `job_finder` what's new.\n"
         "2. Pricing: Ask `pricing_analyst` for estimates based on History.\n"
-        "3. Workers: Ask `worker_manager` who is free.\n\n"
-        "Flow: If a user wants a job, find it, then check history to tell them what it might pay, then find a worker if they are a customer."
+        "3. Workers: Ask `worker_manager` who is free, or to assign workers to all open jobs.\n"
+        "4. Picked job: Once the user picks a job (e.g. 'I'll take J101'), hand over to `job_briefing`, "
+        "which prices it and finds workers for it at the same time.\n\n"
+        "Flow: If a user wants a job, find it; when they pick one, use `job_briefing` instead of asking "
+        "`pricing_analyst` and `worker_manager` one after the other."
     ),
     tools=[], 
-    sub_agents=[job_finder_agent, pricing_analyst_agent, worker_manager_agent]
+    sub_agents=[job_finder_agent, pricing_analyst_agent, worker_manager_agent, job_briefing_agent]
 )
+
+# Token-bounded history with the key facts kept in session state (CONTEXT_MAX_TOKENS, CONTEXT_KEEP_TURNS)
+install_compaction(root_agent)
+# Latency/token metrics for every agent, LLM call and tool call
+instrument(root_agent)
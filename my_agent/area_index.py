@@ -0,0 +1,162 @@
+"""
+Indexed fuzzy lookup of area names.
+
+Gives the same answers as `difflib.get_close_matches` over the area names, but
+only runs `SequenceMatcher` on names that can still reach the cutoff: a
+length-bucket filter and a per-name character-count matrix bound the score
+first (these are difflib's own real_quick_ratio/quick_ratio bounds, computed
+for all names at once). Resolved queries are kept in an LRU cache.
+"""
+import bisect
+import csv
+import difflib
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CUTOFF = 0.6
+
+# Suffixes India Post uses on office names ("Indiranagar S.O", "Hebbal B.O").
+_OFFICE_SUFFIXES = (" s.o", " b.o", " h.o", " g.p.o", " so", " bo", " ho")
+
+
+def normalize_area(name: str) -> str:
+    n = " ".join(name.lower().split())
+    for suffix in _OFFICE_SUFFIXES:
+        if n.endswith(suffix):
+            return n[:-len(suffix)].strip()
+    return n
+
+
+class _AreaIndex:
+    """Names sorted by length plus their character-count matrix. Never changed
+    once built; the resolver swaps in a new one as a whole."""
+    __slots__ = ('areas', 'names', 'lengths', 'length_array', 'columns', 'char_counts')
+
+    def __init__(self, areas: Dict[str, str]):
+        # Names sorted by length so a score bound turns into a bisect range.
+        names = sorted(areas, key=len)
+        self.areas = dict(areas)
+        self.names = names
+        self.lengths = [len(n) for n in names]
+        self.length_array = np.array(self.lengths, dtype=np.int32)
+        # Character-count matrix: one row per name, one column per character seen.
+        columns: Dict[str, int] = {}
+        for name in names:
+            for ch in name:
+                columns.setdefault(ch, len(columns))
+        counts = np.zeros((len(names), max(len(columns), 1)), dtype=np.int16)
+        for row, name in enumerate(names):
+            for ch, c in Counter(name).items():
+                counts[row, columns[ch]] = c
+        self.columns = columns
+        self.char_counts = counts
+
+
+class AreaResolver:
+    """Area name -> pincode with exact, cached and fuzzy lookup.
+
+    Lookups read one `_AreaIndex` and never take the lock, so adding names
+    (a gazetteer load) builds a new index and publishes it in one assignment.
+    """
+
+    def __init__(self, areas: Dict[str, str], cache_size: int = 4096):
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+        self._publish(_AreaIndex(areas))
+
+    def _publish(self, index: _AreaIndex) -> None:
+        self._index = index
+        # A new cache rather than a cleared one: a lookup still running on the
+        # old index can only fill the old cache.
+        self._resolve = lru_cache(maxsize=self._cache_size)(self._resolve_uncached)
+
+    def __len__(self) -> int:
+        return len(self._index.areas)
+
+    def add_areas(self, areas: Dict[str, str], overwrite: bool = False) -> int:
+        """Merges more area names into the index; returns how many were new."""
+        with self._lock:
+            merged = dict(self._index.areas)
+            added = 0
+            for name, pincode in areas.items():
+                key = normalize_area(name)
+                if not key or (key in merged and not overwrite):
+                    continue
+                added += key not in merged
+                merged[key] = pincode
+            self._publish(_AreaIndex(merged))
+        return added
+
+    def load_gazetteer(self, path: str, name_field: str = "officename",
+                       pincode_field: str = "pincode") -> int:
+        """Loads area names from a CSV (e.g. the India Post office directory).
+
+        Existing names keep their pincode; returns how many names were added.
+        """
+        areas: Dict[str, str] = {}
+        with open(path, mode='r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                name, pincode = row.get(name_field), row.get(pincode_field)
+                if name and pincode:
+                    areas.setdefault(normalize_area(name), pincode.strip())
+        return self.add_areas(areas)
+
+    def candidates(self, query: str, n: int = 3,
+                   cutoff: float = DEFAULT_CUTOFF) -> List[Tuple[str, str, float]]:
+        """Best (area, pincode, score) matches for `query`, highest score first.
+
+        Scores and tie-breaking are those of `difflib.get_close_matches`.
+        """
+        return self._candidates(self._index, query.lower().strip(), n, cutoff)
+
+    @staticmethod
+    def _candidates(index: _AreaIndex, q: str, n: int, cutoff: float) -> List[Tuple[str, str, float]]:
+        if not q:
+            return []
+        qlen = len(q)
+        # real_quick_ratio bound: 2*min(a, b) / (a + b) >= cutoff
+        lo = bisect.bisect_left(index.lengths, qlen * cutoff / (2 - cutoff) - 1e-9)
+        hi = bisect.bisect_right(index.lengths, qlen * (2 - cutoff) / cutoff + 1e-9) if cutoff > 0 else len(index.names)
+        if lo >= hi:
+            return []
+        # quick_ratio bound: characters in common, regardless of order
+        qcounts = Counter(q)
+        known = [(index.columns[ch], c) for ch, c in qcounts.items() if ch in index.columns]
+        common = np.zeros(hi - lo, dtype=np.int32)
+        for col, c in known:
+            common += np.minimum(index.char_counts[lo:hi, col], c)
+        total = index.length_array[lo:hi] + qlen
+        survivors = np.nonzero(2.0 * common / total >= cutoff)[0] + lo
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(q)
+        scored = []
+        for i in survivors.tolist():
+            name = index.names[i]
+            matcher.set_seq1(name)
+            score = matcher.ratio()
+            if score >= cutoff:
+                scored.append((score, name))
+        scored.sort(reverse=True)
+        return [(name, index.areas[name], score) for score, name in scored[:n]]
+
+    def _resolve_uncached(self, q: str) -> Optional[str]:
+        index = self._index
+        if q in index.areas:
+            return index.areas[q]
+        best = self._candidates(index, q, 1, DEFAULT_CUTOFF)
+        return best[0][1] if best else None
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Pincode for an area name or close misspelling, else None."""
+        return self._resolve(query.lower().strip())
+
+    def cache_info(self):
+        return self._resolve.cache_info()
+
+    def cache_clear(self) -> None:
+        self._resolve.cache_clear()
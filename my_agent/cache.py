@@ -0,0 +1,125 @@
+"""
+Result cache for the tool functions.
+
+Entries are keyed on normalized arguments plus the version of the loaded data
+files, live for a TTL, and are evicted least-recently-used beyond a size
+bound. Any change to a CSV bumps the data version and clears the caches.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from .datastore import history_source, jobs_source, workers_source
+
+DEFAULT_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+DEFAULT_TTL = float(os.getenv("TOOL_CACHE_TTL", "300"))
+
+_MISSING = object()
+
+
+def data_version() -> Tuple[int, int, int]:
+    """Changes whenever any of the CSV files is reloaded (or a SQLite table written)."""
+    return (jobs_source.version(), history_source.version(), workers_source.version())
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, name: str, maxsize: int = DEFAULT_SIZE, ttl: float = DEFAULT_TTL):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Any = None
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key: Hashable, version: Any) -> Any:
+        with self._lock:
+            if version != self._version:
+                if self._data:
+                    self.invalidations += 1
+                self._data.clear()
+                self._version = version
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return _MISSING
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, version: Any, value: Any) -> None:
+        with self._lock:
+            if version != self._version:
+                return  # data changed while computing; don't cache a stale result
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+_caches: Dict[str, TTLCache] = {}
+
+
+def cached(normalize: Callable[..., Tuple[tuple, Hashable]],
+           maxsize: int = DEFAULT_SIZE, ttl: float = DEFAULT_TTL):
+    """Caches a function on normalized arguments.
+
+    `normalize` takes the call's arguments and returns (args to call the
+    function with, cache key), so equivalent calls share one entry and the
+    cached value always matches its key.
+    """
+    def decorator(fn):
+        cache = _caches[fn.__name__] = TTLCache(fn.__name__, maxsize, ttl)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            call_args, key = normalize(*args, **kwargs)
+            version = data_version()
+            value = cache.get(key, version)
+            if value is _MISSING:
+                value = fn(*call_args)
+                cache.put(key, version, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches() -> None:
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,179 @@
+"""
+Bounded conversation history for the agents' LLM calls.
+
+Every model call replays the whole session, and old tool results (full job
+listings, worker lists) would otherwise stay in it forever. `install(agent)`
+adds callbacks to every agent in a tree that, before each request goes out:
+
+- keep the last CONTEXT_KEEP_TURNS user turns as they are;
+- cut tool results and long texts (answers, other agents' relayed transcripts)
+  in older turns down to their first CONTEXT_OLD_PART_CHARS characters;
+- drop the oldest turns while the history is over CONTEXT_MAX_TOKENS;
+- add the facts worth keeping (trade, area, pincode, chosen job) from session
+  state to the system instruction, so the turns they came from can go.
+
+The session keeps every event; only what is sent to the model is cut down.
+Token counts are estimated from characters (about 4 per token).
+"""
+import json
+import os
+import re
+from typing import Any, List, Optional, Tuple
+
+from google.genai import types
+
+from .pincode_distance import get_area_resolver
+from .telemetry import _with_callback, record_context
+
+MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "6000"))
+KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "2"))
+OLD_PART_CHARS = int(os.getenv("CONTEXT_OLD_PART_CHARS", "400"))
+
+_CHARS_PER_TOKEN = 4
+# Relayed transcripts of other agents arrive as user messages with this prefix.
+_OTHER_AGENT_PREFIX = "For context:"
+_JOB_ID = re.compile(r"\bJ\d{3,}\b", re.IGNORECASE)
+
+# Session state keys of the facts carried across turns, with their labels.
+FACTS = (("gig_trade", "trade"), ("gig_location", "area"), ("gig_pincode", "pincode"),
+         ("gig_job_id", "selected job"))
+
+
+def _part_chars(part: types.Part) -> int:
+    if part.text:
+        return len(part.text)
+    if part.function_response:
+        return len(json.dumps(part.function_response.response, default=str))
+    if part.function_call:
+        return len(part.function_call.name or "") + len(json.dumps(part.function_call.args, default=str))
+    return 0
+
+
+def estimate_tokens(contents: List[types.Content], system_instruction: Any = None) -> int:
+    chars = sum(_part_chars(p) for c in contents for p in c.parts or ())
+    if isinstance(system_instruction, str):
+        chars += len(system_instruction)
+    return chars // _CHARS_PER_TOKEN
+
+
+def _user_text(content: types.Content) -> Optional[str]:
+    """The text of a message typed by the user, None for any other content."""
+    if content.role != "user" or not content.parts:
+        return None
+    texts = [p.text for p in content.parts if p.text]
+    if not texts or any(p.function_response for p in content.parts) or texts[0].startswith(_OTHER_AGENT_PREFIX):
+        return None
+    return "\n".join(texts)
+
+
+def _turns(contents: List[types.Content]) -> List[List[types.Content]]:
+    """Contents split before each user message (anything earlier is turn 0)."""
+    turns: List[List[types.Content]] = [[]]
+    for content in contents:
+        if _user_text(content) is not None and turns[-1]:
+            turns.append([])
+        turns[-1].append(content)
+    return [t for t in turns if t]
+
+
+def _cut(text: str, limit: int) -> Optional[str]:
+    """`text` cut to `limit` characters plus a note saying so; None when that
+    would not be shorter than `text` itself."""
+    note = f" ... [{len(text) - limit} more characters dropped from history]"
+    if len(text) <= limit + len(note):
+        return None
+    return text[:limit] + note
+
+
+def _shrink(content: types.Content, limit: int) -> types.Content:
+    """Copy of `content` with tool results and long texts cut to `limit` characters."""
+    if _user_text(content) is not None:
+        return content
+    parts = []
+    for part in content.parts or ():
+        if part.function_response and _part_chars(part) > limit:
+            response = part.function_response.response or {}
+            result = response.get("result", response) if isinstance(response, dict) else response
+            text = result if isinstance(result, str) else json.dumps(result, default=str)
+            cut = _cut(text, limit)
+            if cut is not None:
+                part = part.model_copy(update={"function_response": part.function_response.model_copy(
+                    update={"response": {"result": cut}})})
+        elif part.text and len(part.text) > limit:
+            cut = _cut(part.text, limit)
+            if cut is not None:
+                part = part.model_copy(update={"text": cut})
+        parts.append(part)
+    return content.model_copy(update={"parts": parts})
+
+
+def compact(contents: List[types.Content], max_tokens: int = MAX_TOKENS, keep_turns: int = KEEP_TURNS,
+            part_chars: int = OLD_PART_CHARS, fixed_tokens: int = 0) -> Tuple[List[types.Content], int]:
+    """(compacted contents, number of turns dropped). `fixed_tokens` is the
+    part of the prompt that cannot be cut (system instruction)."""
+    turns = _turns(contents)
+    old = max(0, len(turns) - keep_turns)
+    turns = [[_shrink(c, part_chars) for c in turn] for turn in turns[:old]] + turns[old:]
+    tokens = fixed_tokens + sum(estimate_tokens(turn) for turn in turns)
+    dropped = 0
+    # Whole turns go, so every tool call keeps its response; the current turn always stays.
+    while tokens > max_tokens and len(turns) > 1:
+        tokens -= estimate_tokens(turns.pop(0))
+        dropped += 1
+    return [c for turn in turns for c in turn], dropped
+
+
+def _set_fact(state, key: str, value: Any) -> None:
+    if value and state.get(key) != value:
+        state[key] = value
+
+
+def facts_instruction(state) -> Optional[str]:
+    known = [f"{label}: {state[key]}" for key, label in FACTS if state.get(key)]
+    if not known:
+        return None
+    return "Known from earlier in this conversation (older messages may be shortened): " + "; ".join(known) + "."
+
+
+# --- ADK callbacks ---
+
+def before_model(callback_context, llm_request) -> None:
+    contents = llm_request.contents
+    if contents:
+        text = _user_text(contents[-1])
+        job_ids = _JOB_ID.findall(text) if text else []
+        if job_ids:
+            _set_fact(callback_context.state, "gig_job_id", job_ids[-1].upper())
+    facts = facts_instruction(callback_context.state)
+    if facts:
+        llm_request.append_instructions([facts])
+
+    fixed = estimate_tokens([], llm_request.config.system_instruction if llm_request.config else None)
+    before = fixed + estimate_tokens(contents)
+    llm_request.contents, dropped = compact(contents, fixed_tokens=fixed)
+    after = fixed + estimate_tokens(llm_request.contents)
+    record_context(callback_context.agent_name, before, after, dropped_turns=dropped)
+
+
+def after_tool(tool, args, tool_context, tool_response) -> None:
+    """Keeps the trade and place of the latest search in session state."""
+    if not args:
+        return
+    state = tool_context.state
+    _set_fact(state, "gig_trade", args.get("trade") or args.get("category"))
+    # check_worker_availability's `pincode` is often an area name too
+    location = str(args.get("location_query") or args.get("area") or args.get("pincode") or "").strip()
+    if location.isdigit():
+        _set_fact(state, "gig_pincode", location)
+    elif location:
+        _set_fact(state, "gig_location", location)
+        _set_fact(state, "gig_pincode", get_area_resolver().resolve(location))
+
+
+def install(agent) -> None:
+    """Adds history compaction to `agent` and all of its sub-agents."""
+    if hasattr(agent, "before_model_callback"):  # LLM agents; workflow agents have no model calls
+        agent.before_model_callback = _with_callback(agent.before_model_callback, before_model)
+        agent.after_tool_callback = _with_callback(agent.after_tool_callback, after_tool)
+    for sub_agent in agent.sub_agents:
+        install(sub_agent)
@@ -0,0 +1,433 @@
+"""
+Shared in-memory store for the gig CSV files.
+
+Each CSV is parsed once into compact, typed records and indexed by trade and
+pincode. A file is only re-parsed when its mtime changes, and the new table is
+swapped in as a whole, so readers always see a complete snapshot.
+
+With GIG_STORAGE=sqlite the same data lives in an indexed SQLite database
+instead (see `sqlite_store`).
+"""
+import csv
+import heapq
+import io
+import os
+import threading
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+# Get directory of this file; GIG_DATA_DIR points the store at another set of CSVs
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.getenv('GIG_DATA_DIR', BASE_DIR)
+INCOMING_JOBS_CSV = os.path.join(DATA_DIR, 'gig_jobs.csv')
+HISTORICAL_JOBS_CSV = os.path.join(DATA_DIR, 'historical_jobs.csv')
+PROFILES_CSV = os.path.join(DATA_DIR, 'worker_profiles.csv')
+
+# 'csv' (default) or 'sqlite'; the database is imported from the CSVs when first created.
+STORAGE_BACKEND = os.getenv('GIG_STORAGE', 'csv').lower()
+SQLITE_PATH = os.getenv('GIG_SQLITE_PATH', os.path.join(DATA_DIR, 'gig_data.db'))
+
+
+def _to_float(value: Optional[str], default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_int(value: Optional[str], default: int = 0) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+# --- Records ---
+
+@dataclass(frozen=True, slots=True)
+class Job:
+    job_id: str
+    required_trade: str
+    location_zip: str
+    area: str
+    contact_number: str
+    problem_description: str
+    urgency_level: str
+
+    @classmethod
+    def from_row(cls, row: Dict[str, str]) -> 'Job':
+        return cls(
+            job_id=row.get('job_id', ''),
+            required_trade=row.get('required_trade', ''),
+            location_zip=row.get('location_zip', ''),
+            area=row.get('area') or 'Unknown Area',
+            contact_number=row.get('contact_number') or 'N/A',
+            problem_description=row.get('problem_description', ''),
+            urgency_level=row.get('urgency_level') or 'Normal',
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class HistoricalJob:
+    historical_id: str
+    trade: str
+    job_description: str
+    location_zip: str
+    area: str
+    labor_hours: float
+    material_cost: float
+    final_rate_charged: float
+    difficulty_score: int
+    worker_id: str
+    customer_review_text: str
+
+    @classmethod
+    def from_row(cls, row: Dict[str, str]) -> 'HistoricalJob':
+        return cls(
+            historical_id=row.get('historical_id', ''),
+            trade=row.get('trade', ''),
+            job_description=row.get('job_description', ''),
+            location_zip=row.get('location_zip', ''),
+            area=row.get('area') or 'Unknown',
+            labor_hours=_to_float(row.get('labor_hours')),
+            material_cost=_to_float(row.get('material_cost')),
+            final_rate_charged=_to_float(row.get('final_rate_charged')),
+            difficulty_score=_to_int(row.get('difficulty_score')),
+            worker_id=row.get('worker_id', ''),
+            customer_review_text=row.get('customer_review_text', ''),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Worker:
+    worker_id: str
+    name: str
+    trade: str
+    experience_years: int
+    skill_tags: str
+    service_area_zip: str
+    area: str
+    base_hourly_rate: float
+    rating_average: float
+    is_available: bool
+    verified_badge: bool
+    expertise_level: str
+
+    @classmethod
+    def from_row(cls, row: Dict[str, str]) -> 'Worker':
+        return cls(
+            worker_id=row.get('worker_id', ''),
+            name=row.get('name', ''),
+            trade=row.get('trade', ''),
+            experience_years=_to_int(row.get('experience_years')),
+            skill_tags=row.get('skill_tags', ''),
+            service_area_zip=row.get('service_area_zip', ''),
+            area=row.get('area') or row.get('service_area_zip', ''),
+            base_hourly_rate=_to_float(row.get('base_hourly_rate')),
+            rating_average=_to_float(row.get('rating_average')),
+            is_available=row.get('is_available') == 'True',
+            verified_badge=row.get('verified_badge') == 'True',
+            expertise_level=row.get('expertise_level', ''),
+        )
+
+
+R = TypeVar('R')
+
+# Bytes before the end of what was read that must be unchanged to only read what follows.
+_TAIL_CHECK_BYTES = 256
+
+
+def to_csv_row(record) -> Dict[str, str]:
+    """A record as the strings `from_row` parses it from."""
+    return {f.name: str(getattr(record, f.name)) for f in fields(record)}
+
+
+# --- Tables ---
+
+class Table(Generic[R]):
+    """Immutable records of one CSV file plus trade and pincode indexes.
+
+    Indexes hold row positions so lookups can return records in file order.
+    """
+    __slots__ = ('records', 'by_trade', 'by_pincode', 'stamp', 'version')
+
+    def __init__(self, records: Tuple[R, ...], trade_field: str, pincode_field: str,
+                 stamp: Tuple[int, int] = (0, 0), version: int = 0):
+        self.records = records
+        self.stamp = stamp
+        self.version = version
+        by_trade: Dict[str, List[int]] = {}
+        by_pincode: Dict[str, List[int]] = {}
+        for i, rec in enumerate(records):
+            by_trade.setdefault(getattr(rec, trade_field).lower(), []).append(i)
+            by_pincode.setdefault(getattr(rec, pincode_field), []).append(i)
+        self.by_trade = {k: tuple(v) for k, v in by_trade.items()}
+        self.by_pincode = {k: tuple(v) for k, v in by_pincode.items()}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def extend(self, records: Sequence[R], trade_field: str, pincode_field: str,
+               stamp: Tuple[int, int], version: int) -> 'Table[R]':
+        """A new table with `records` appended. The indexes of this one are
+        extended, not rebuilt, and its record objects are shared."""
+        table: Table[R] = Table.__new__(Table)
+        start = len(self.records)
+        table.records = self.records + tuple(records)
+        table.stamp = stamp
+        table.version = version
+        added_trade: Dict[str, List[int]] = {}
+        added_pincode: Dict[str, List[int]] = {}
+        for i, rec in enumerate(records, start):
+            added_trade.setdefault(getattr(rec, trade_field).lower(), []).append(i)
+            added_pincode.setdefault(getattr(rec, pincode_field), []).append(i)
+        table.by_trade = dict(self.by_trade)
+        for key, rows in added_trade.items():
+            table.by_trade[key] = table.by_trade.get(key, ()) + tuple(rows)
+        table.by_pincode = dict(self.by_pincode)
+        for key, rows in added_pincode.items():
+            table.by_pincode[key] = table.by_pincode.get(key, ()) + tuple(rows)
+        return table
+
+    def _trade_groups(self, query: str) -> List[Tuple[int, ...]]:
+        q = query.lower()
+        return [rows for trade, rows in self.by_trade.items() if q in trade]
+
+    def match_trade_rows(self, query: str) -> Set[int]:
+        """Row positions whose trade contains `query` (case-insensitive)."""
+        return {i for rows in self._trade_groups(query) for i in rows}
+
+    def match_trade(self, query: str) -> List[R]:
+        """Records whose trade contains `query` (case-insensitive), in file order."""
+        groups = self._trade_groups(query)
+        if not groups:
+            return []
+        if len(groups) == 1:
+            return [self.records[i] for i in groups[0]]
+        return [self.records[i] for i in heapq.merge(*groups)]
+
+    def at_pincode(self, pincode: str) -> List[R]:
+        return [self.records[i] for i in self.by_pincode.get(pincode, ())]
+
+
+class CsvSource(Generic[R]):
+    """Loads a CSV into a Table and reloads it when the file's mtime (or size) changes.
+
+    When rows were only appended (same file, the bytes read so far unchanged),
+    just the new rows are parsed and added to the indexes of the current table.
+    """
+
+    def __init__(self, path: str, parse: Callable[[Dict[str, str]], R],
+                 key_field: str, trade_field: str, pincode_field: str):
+        self.path = path
+        self._parse = parse
+        self.key_field = key_field
+        self._trade_field = trade_field
+        self._pincode_field = pincode_field
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._table: Table[R] = Table((), trade_field, pincode_field, stamp=(-1, -1))
+        # Where the rows read so far end: (inode, byte offset, the bytes just before
+        # it, header), or None when the next change needs a full load.
+        self._tail: Optional[Tuple[int, int, bytes, List[str]]] = None
+
+    def _stamp(self) -> Tuple[int, int]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return (0, 0)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, stamp: Tuple[int, int], version: int) -> Table[R]:
+        self._tail = None
+        try:
+            with open(self.path, mode='rb') as f:
+                data = f.read()
+                inode = os.fstat(f.fileno()).st_ino
+        except FileNotFoundError:
+            return Table((), self._trade_field, self._pincode_field, stamp, version)
+        reader = csv.DictReader(io.StringIO(data.decode('utf-8')))
+        records = tuple(self._parse(row) for row in reader)
+        # A last line without a newline may still be being written: reload in full next time.
+        if data.endswith(b'\n') and reader.fieldnames:
+            self._tail = (inode, len(data), data[-_TAIL_CHECK_BYTES:], list(reader.fieldnames))
+        return Table(records, self._trade_field, self._pincode_field, stamp, version)
+
+    def _load_appended(self, table: Table[R], stamp: Tuple[int, int]) -> Optional[Table[R]]:
+        """`table` plus the rows appended to the file since it was read, or
+        None if the file changed in any other way."""
+        if self._tail is None:
+            return None
+        inode, offset, before, header = self._tail
+        try:
+            with open(self.path, mode='rb') as f:
+                st = os.fstat(f.fileno())
+                if st.st_ino != inode or st.st_size < offset:
+                    return None
+                f.seek(offset - len(before))
+                if f.read(len(before)) != before:
+                    return None
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # Only whole lines; a row still being written is read on the next change.
+        data = data[:data.rfind(b'\n') + 1]
+        rows = csv.DictReader(io.StringIO(data.decode('utf-8')), fieldnames=header)
+        records = [self._parse(row) for row in rows]
+        if data:
+            self._tail = (inode, offset + len(data), (before + data)[-_TAIL_CHECK_BYTES:], header)
+        # Same version when nothing complete was added, so cached results stay valid.
+        return table.extend(records, self._trade_field, self._pincode_field, stamp,
+                            table.version + 1 if records else table.version)
+
+    def get(self) -> Table[R]:
+        table = self._table
+        stamp = self._stamp()
+        if stamp == table.stamp:
+            return table
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock.
+            if self._table.stamp != stamp:
+                table = self._table
+                self._table = self._load_appended(table, stamp) or self._load(stamp, table.version + 1)
+            return self._table
+
+    def version(self) -> int:
+        return self.get().version
+
+    def prime(self, records: Tuple[R, ...], stamp: Tuple[int, int]) -> bool:
+        """Takes `records`, read from the file elsewhere (a snapshot), as its
+        contents as of `stamp`. False, changing nothing, if the file has
+        changed since."""
+        with self._lock:
+            try:
+                with open(self.path, mode='rb') as f:
+                    st = os.fstat(f.fileno())
+                    if (st.st_mtime_ns, st.st_size) != stamp:
+                        return False
+                    header = next(csv.reader([f.readline().decode('utf-8')]), None)
+                    f.seek(max(st.st_size - _TAIL_CHECK_BYTES, 0))
+                    before = f.read()
+            except FileNotFoundError:
+                return False
+            # Later appends are still read incrementally, as after a full load.
+            self._tail = (st.st_ino, st.st_size, before, header) if header and before.endswith(b'\n') else None
+            self._table = Table(records, self._trade_field, self._pincode_field, stamp, self._table.version + 1)
+            return True
+
+    def upsert(self, records: Sequence[R]) -> int:
+        """Writes records to the file: appended, unless one replaces a row with
+        the same key, in which case the file is rewritten with it in place."""
+        new = {getattr(r, self.key_field): to_csv_row(r) for r in records}
+        with self._write_lock:
+            # Read under the lock, so it includes rows another upsert just wrote.
+            existing = {getattr(r, self.key_field) for r in self.get().records}
+            if new.keys() & existing:
+                self._rewrite(new)
+            else:
+                self._append(new.values())
+        return len(new)
+
+    def update(self, key: str, **changes: object) -> bool:
+        """Changes some fields of the row with `key`; False if there is none."""
+        if not any(getattr(r, self.key_field) == key for r in self.get().records):
+            return False
+        with self._write_lock:
+            self._rewrite({key: {name: str(value) for name, value in changes.items()}})
+        return True
+
+    def _append(self, rows: Iterable[Dict[str, str]]) -> None:
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size:
+                    f.seek(-1, os.SEEK_END)
+                needs_newline = bool(size) and f.read(1) != b'\n'
+            with open(self.path, mode='r', encoding='utf-8') as f:
+                header = next(csv.reader(f), None)
+        except FileNotFoundError:
+            size, needs_newline, header = 0, False, None
+        rows = list(rows)
+        fieldnames = header or list(rows[0])
+        with open(self.path, mode='a', encoding='utf-8', newline='') as f:
+            if needs_newline:
+                f.write('\n')
+            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator='\n', extrasaction='ignore')
+            if not header:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    def _rewrite(self, updates: Dict[str, Dict[str, str]]) -> None:
+        # Untouched rows are copied as they are; the new file replaces the old atomically.
+        pending = dict(updates)
+        with open(self.path, mode='r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            fieldnames = list(reader.fieldnames or [])
+            rows = []
+            for row in reader:
+                changes = pending.pop(row.get(self.key_field), None)
+                if changes:
+                    row.update(changes)
+                rows.append(row)
+        rows.extend(pending.values())
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, mode='w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator='\n', extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, self.path)
+
+
+if STORAGE_BACKEND == 'sqlite':
+    # Imported here: sqlite_store builds on the record and Table types above.
+    from .sqlite_store import SqliteDb, SqliteSource
+
+    sqlite_db = SqliteDb(SQLITE_PATH)
+    if sqlite_db.created:
+        sqlite_db.import_csvs(DATA_DIR)
+    jobs_source = SqliteSource(sqlite_db, 'jobs', Job, 'job_id', 'required_trade', 'location_zip')
+    history_source = SqliteSource(sqlite_db, 'history', HistoricalJob, 'historical_id', 'trade', 'location_zip')
+    workers_source = SqliteSource(sqlite_db, 'workers', Worker, 'worker_id', 'trade', 'service_area_zip')
+elif STORAGE_BACKEND == 'csv':
+    jobs_source = CsvSource(INCOMING_JOBS_CSV, Job.from_row, 'job_id', 'required_trade', 'location_zip')
+    history_source = CsvSource(HISTORICAL_JOBS_CSV, HistoricalJob.from_row, 'historical_id', 'trade', 'location_zip')
+    workers_source = CsvSource(PROFILES_CSV, Worker.from_row, 'worker_id', 'trade', 'service_area_zip')
+else:
+    raise ValueError(f"Unknown GIG_STORAGE: {STORAGE_BACKEND}")
+
+
+def get_jobs() -> Table[Job]:
+    return jobs_source.get()
+
+
+def get_history() -> Table[HistoricalJob]:
+    return history_source.get()
+
+
+def get_workers() -> Table[Worker]:
+    return workers_source.get()
+
+
+def upsert_jobs(jobs: Iterable[Job]) -> int:
+    """Adds incoming jobs, replacing any with the same job_id."""
+    return jobs_source.upsert(list(jobs))
+
+
+def upsert_workers(workers: Iterable[Worker]) -> int:
+    """Adds worker profiles, replacing any with the same worker_id."""
+    return workers_source.upsert(list(workers))
+
+
+def set_worker_availability(worker_id: str, available: bool) -> bool:
+    """False if there is no such worker."""
+    return workers_source.update(worker_id, is_available=available)
+
+
+def set_data_dir(path: str) -> None:
+    """Points the store at the CSVs in `path`; they load on next access."""
+    if STORAGE_BACKEND != 'csv':
+        raise RuntimeError("set_data_dir only applies to GIG_STORAGE=csv")
+    jobs_source.path = os.path.join(path, 'gig_jobs.csv')
+    history_source.path = os.path.join(path, 'historical_jobs.csv')
+    workers_source.path = os.path.join(path, 'worker_profiles.csv')
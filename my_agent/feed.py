@@ -0,0 +1,169 @@
+"""
+Push delivery of newly added incoming jobs.
+
+`job_feed` notices jobs added to the store (rows appended to gig_jobs.csv,
+jobs posted to the ingestion endpoint) by comparing table snapshots, and
+matches each new job in-process against the subscriptions: a trade (matched as
+in search, by substring) and a radius around a pincode. Subscriptions are
+grouped by trade, and a job is checked against a whole group with one NumPy
+lookup into the distance matrix, so one job costs the same for ten or ten
+thousand subscribers of a trade.
+
+Each subscription has a bounded queue on its event loop. A subscriber that
+does not keep up loses the newest jobs rather than slowing the others down.
+"""
+import asyncio
+import json
+import os
+import threading
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+
+from .datastore import Job, Table, get_jobs
+from .spatial import get_distance_matrix
+
+FEED_JOBS = Counter("gig_feed_jobs_total", "New jobs seen by the job feed")
+FEED_DELIVERIES = Counter("gig_feed_deliveries_total", "Jobs delivered to feed subscribers")
+FEED_DROPPED = Counter("gig_feed_dropped_total", "Jobs not delivered because a subscriber's queue was full")
+FEED_SUBSCRIBERS = Gauge("gig_feed_subscribers", "Open job feed subscriptions")
+
+
+class Subscription:
+    """New jobs for one subscriber, as JSON strings on `queue`."""
+
+    def __init__(self, trade: str, pincode: str, radius_km: float, max_queue: int):
+        self.trade = trade.strip().lower()
+        self.pincode = pincode
+        self.radius_km = radius_km
+        # Created on the subscriber's event loop; deliveries may come from any thread.
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(max_queue)
+        self.delivered = 0
+        self.dropped = 0
+
+    def _put(self, message: str) -> None:
+        try:
+            self.queue.put_nowait(message)
+            self.delivered += 1
+            FEED_DELIVERIES.inc()
+        except asyncio.QueueFull:
+            self.dropped += 1
+            FEED_DROPPED.inc()
+
+    def deliver(self, message: str) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            pass  # loop closed: the subscriber is gone
+
+
+class _TradeGroup:
+    """Subscriptions to one trade, with their pincode rows and radii as arrays.
+    Replaced as a whole on every change, so a publisher's view stays consistent."""
+
+    def __init__(self, subs: List[Subscription], rows: np.ndarray, radii: np.ndarray):
+        self.subs = subs
+        self.rows = rows
+        self.radii = radii
+
+    def add(self, sub: Subscription, row: int) -> "_TradeGroup":
+        return _TradeGroup(self.subs + [sub], np.append(self.rows, row), np.append(self.radii, sub.radius_km))
+
+    def remove(self, sub: Subscription) -> "_TradeGroup":
+        i = next(i for i, s in enumerate(self.subs) if s is sub)
+        return _TradeGroup(self.subs[:i] + self.subs[i + 1:], np.delete(self.rows, i), np.delete(self.radii, i))
+
+
+_EMPTY_GROUP = _TradeGroup([], np.empty(0, dtype=np.int64), np.empty(0))
+
+
+class JobFeed:
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._groups: Dict[str, _TradeGroup] = {}
+        self._subs_lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        # Snapshot the last check compared against; None until there is a subscriber.
+        self._table: Optional[Table[Job]] = None
+
+    def __len__(self) -> int:
+        return sum(len(g.subs) for g in self._groups.values())
+
+    def subscribe(self, trade: str, pincode: str, radius_km: float) -> Subscription:
+        """Call from the subscriber's event loop. `pincode` must be a known one."""
+        row = get_distance_matrix().index_of(pincode)
+        if row is None:
+            raise ValueError(f"Unknown pincode: {pincode}")
+        with self._check_lock:
+            # Jobs added while nobody was subscribed are not news to anyone.
+            if self._table is None or not self._groups:
+                self._table = get_jobs()
+        sub = Subscription(trade, pincode, radius_km, self.max_queue)
+        with self._subs_lock:
+            self._groups[sub.trade] = self._groups.get(sub.trade, _EMPTY_GROUP).add(sub, row)
+        FEED_SUBSCRIBERS.inc()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._subs_lock:
+            group = self._groups.get(sub.trade)
+            if group is None or not any(s is sub for s in group.subs):
+                return
+            if len(group.subs) > 1:
+                self._groups[sub.trade] = group.remove(sub)
+            else:
+                del self._groups[sub.trade]
+        FEED_SUBSCRIBERS.dec()
+
+    def check(self) -> int:
+        """Publishes the jobs added since the last check; returns how many."""
+        with self._check_lock:
+            table = get_jobs()
+            old, self._table = self._table, table
+            if old is None or table is old:
+                return 0
+            new = _added(old, table)
+        FEED_JOBS.inc(len(new))
+        for job in new:
+            self.publish(job)
+        return len(new)
+
+    def publish(self, job: Job) -> int:
+        """Delivers `job` to every matching subscription; returns how many."""
+        matrix = get_distance_matrix()
+        row = matrix.index_of(job.location_zip)
+        if row is None:
+            return 0
+        job_trade = job.required_trade.lower()
+        with self._subs_lock:
+            groups = [g for trade, g in self._groups.items() if trade in job_trade]
+        job_json = json.dumps(asdict(job), ensure_ascii=False)
+        count = 0
+        for group in groups:
+            dists = matrix.matrix[row, group.rows]
+            for i in np.flatnonzero(dists <= group.radii).tolist():
+                group.subs[i].deliver(f'{{"job": {job_json}, "distance_km": {dists[i]:.2f}}}')
+                count += 1
+        return count
+
+    async def watch(self, interval: float) -> None:
+        """Checks for new jobs every `interval` seconds (file appends by other writers)."""
+        while True:
+            await asyncio.sleep(interval)
+            if self._groups:
+                await asyncio.to_thread(self.check)
+
+
+def _added(old: Table[Job], new: Table[Job]) -> List[Job]:
+    n = len(old)
+    # An appended-to table shares the old one's records (Table.extend).
+    if len(new) >= n and (n == 0 or new.records[n - 1] is old.records[-1]):
+        return list(new.records[n:])
+    seen = {job.job_id for job in old.records}
+    return [job for job in new.records if job.job_id not in seen]
+
+
+job_feed = JobFeed(max_queue=int(os.getenv("FEED_QUEUE_SIZE", "100")))
@@ -0,0 +1,149 @@
+"""
+Batch matching of open jobs to available workers.
+
+Jobs and workers are split into blocks by trade. Each block gets a NumPy cost
+matrix built from the pincode distance matrix plus the worker's rating and
+expertise. Pairs beyond `max_km` are not allowed, and more urgent jobs are
+served first. Two ways to assign:
+
+- "greedy": jobs in urgency order each take their cheapest free worker.
+- "optimal": a minimum-cost assignment per block (Hungarian method,
+  `scipy.optimize.linear_sum_assignment`). It fills as many jobs as the
+  distance limit allows, then prefers urgent jobs and lower cost.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .datastore import Job, Worker
+from .spatial import get_distance_matrix
+
+MODES = ("greedy", "optimal")
+
+URGENCY_RANK = {"high": 0, "medium": 1, "normal": 1, "low": 2}
+# Bonus for assigning a job, by urgency rank: what makes urgent jobs win a scarce worker.
+_URGENCY_BONUS = np.array([2.0, 1.0, 0.0])
+_EXPERTISE = {"novice": 0, "moderate": 1, "expert": 2, "elite": 3}
+
+# Cost weights: distance as a fraction of max_km, rating gap to 5 stars, expertise gap to Elite.
+DISTANCE_WEIGHT = 1.0
+RATING_WEIGHT = 0.5
+EXPERTISE_WEIGHT = 0.3
+
+_INFEASIBLE = 1e6
+
+
+@dataclass(frozen=True, slots=True)
+class Assignment:
+    job: Job
+    worker: Worker
+    distance_km: float
+    cost: float
+
+
+@dataclass
+class MatchResult:
+    mode: str
+    assignments: List[Assignment]
+    unassigned_jobs: List[Job]
+    idle_workers: int
+
+    @property
+    def total_distance_km(self) -> float:
+        return sum(a.distance_km for a in self.assignments)
+
+
+def _pincode_rows(pincodes: Sequence[str]) -> np.ndarray:
+    """Distance-matrix row per pincode, -1 where the pincode is unknown."""
+    matrix = get_distance_matrix()
+    rows: Dict[str, int] = {}
+    out = np.empty(len(pincodes), dtype=np.int64)
+    for i, p in enumerate(pincodes):
+        row = rows.get(p)
+        if row is None:
+            found = matrix.index_of(p)
+            row = rows[p] = -1 if found is None else found
+        out[i] = row
+    return out
+
+
+def _block_costs(jobs: Sequence[Job], workers: Sequence[Worker],
+                 max_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(cost, distance, urgency rank) for one trade; cost is _INFEASIBLE beyond max_km."""
+    matrix = get_distance_matrix().matrix
+    job_rows = _pincode_rows([j.location_zip for j in jobs])
+    worker_rows = _pincode_rows([w.service_area_zip for w in workers])
+    dist = matrix[np.ix_(np.maximum(job_rows, 0), np.maximum(worker_rows, 0))]
+    dist[job_rows < 0, :] = np.inf
+    dist[:, worker_rows < 0] = np.inf
+
+    rating = np.array([w.rating_average for w in workers], dtype=np.float64)
+    expertise = np.array([_EXPERTISE.get(w.expertise_level.lower(), 0) for w in workers], dtype=np.float64)
+    urgency = np.array([URGENCY_RANK.get(j.urgency_level.lower(), 1) for j in jobs], dtype=np.int64)
+    worker_cost = RATING_WEIGHT * (5.0 - np.clip(rating, 0, 5)) / 5.0 + EXPERTISE_WEIGHT * (3.0 - expertise) / 3.0
+
+    cost = DISTANCE_WEIGHT * dist / max_km + worker_cost[None, :] - _URGENCY_BONUS[urgency][:, None]
+    cost[~(dist <= max_km)] = _INFEASIBLE
+    return cost, dist, urgency
+
+
+def _greedy(cost: np.ndarray, urgency: np.ndarray) -> List[Tuple[int, int]]:
+    pairs = []
+    free = np.ones(cost.shape[1], dtype=bool)
+    # Stable sort: equally urgent jobs go in file order.
+    for j in np.argsort(urgency, kind="stable"):
+        row = np.where(free, cost[j], np.inf)
+        w = int(np.argmin(row))
+        if row[w] < _INFEASIBLE:
+            pairs.append((int(j), w))
+            free[w] = False
+            if not free.any():
+                break
+    return pairs
+
+
+def _optimal(cost: np.ndarray) -> List[Tuple[int, int]]:
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError as e:
+        raise RuntimeError("mode='optimal' needs scipy (pip install scipy)") from e
+    jobs, workers = linear_sum_assignment(cost)
+    return [(int(j), int(w)) for j, w in zip(jobs, workers) if cost[j, w] < _INFEASIBLE]
+
+
+def match(jobs: Sequence[Job], workers: Sequence[Worker], mode: str = "greedy",
+          max_km: float = 15.0) -> MatchResult:
+    """Assigns each job at most one available worker of the same trade within
+    `max_km`, and each worker at most one job."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    jobs_by_trade: Dict[str, List[int]] = {}
+    for i, job in enumerate(jobs):
+        jobs_by_trade.setdefault(job.required_trade.strip().lower(), []).append(i)
+    workers_by_trade: Dict[str, List[Worker]] = {}
+    for w in workers:
+        if w.is_available:
+            workers_by_trade.setdefault(w.trade.strip().lower(), []).append(w)
+
+    assigned: Dict[int, Assignment] = {}
+    idle = sum(len(ws) for trade, ws in workers_by_trade.items() if trade not in jobs_by_trade)
+    for trade, job_ids in jobs_by_trade.items():
+        block_workers = workers_by_trade.get(trade, [])
+        if not block_workers:
+            continue
+        block_jobs = [jobs[i] for i in job_ids]
+        cost, dist, urgency = _block_costs(block_jobs, block_workers, max_km)
+        pairs = _greedy(cost, urgency) if mode == "greedy" else _optimal(cost)
+        for j, w in pairs:
+            assigned[job_ids[j]] = Assignment(block_jobs[j], block_workers[w], float(dist[j, w]), float(cost[j, w]))
+        idle += len(block_workers) - len(pairs)
+
+    # Urgent jobs first, then file order
+    order = sorted(assigned, key=lambda i: (URGENCY_RANK.get(jobs[i].urgency_level.lower(), 1), i))
+    return MatchResult(
+        mode=mode,
+        assignments=[assigned[i] for i in order],
+        unassigned_jobs=[job for i, job in enumerate(jobs) if i not in assigned],
+        idle_workers=idle,
+    )
@@ -1,4 +1,5 @@
 from typing import Dict, Tuple, Optional
+from .area_index import AreaResolver
 
 # Approximate Lat/Lon for Demo purposes (Clustered by region)
 # Central: 12.97, 77.59
@@ -64,25 +65,19 @@ def get_coords(pincode: str) -> Tuple[float, float]:
         return BANGALORE_CENTER
     return None
 
-import difflib
+_area_resolver = AreaResolver(AREA_MAP)
+
+def get_area_resolver() -> AreaResolver:
+    """Shared resolver; use `load_gazetteer` on it to add more localities."""
+    return _area_resolver
 
 def resolve_pincode(query: str) -> str:
     """Tries to resolve an area name or pincode to a valid pincode string.
        Supports fuzzy matching for typos (e.g. 'indiranager' -> 'indiranagar').
     """
-    q = query.lower().strip()
-    
-    # 1. Exact Match
-    if q in AREA_MAP:
-        return AREA_MAP[q]
-        
-    # 2. Fuzzy Match
-    # Cutoff 0.6 allows for reasonable typos (e.g. "indiranagr") without too many false positives
-    matches = difflib.get_close_matches(q, AREA_MAP.keys(), n=1, cutoff=0.6)
-    if matches:
-        return AREA_MAP[matches[0]]
-        
-    return query
+    # Exact match, then fuzzy match (cached). Cutoff 0.6 allows for reasonable
+    # typos (e.g. "indiranagr") without too many false positives
+    return _area_resolver.resolve(query) or query
 
 def get_distance(pincode1: str, pincode2: str) -> float:
     """Calculates approximate Euclidean distance between two pincodes in Km."""
@@ -0,0 +1,45 @@
+"""
+Loading the data and building the indexes before the first request needs them.
+
+Every step of `warm()` is something a request would otherwise do lazily: load
+the job, worker and history tables, build the pincode distance matrix and
+area resolver, the spatial grids, the rate engine and the BM25 index. Later
+requests only reload what has changed since.
+
+With GIG_SNAPSHOT set to a file path (CSV storage only), the tables and text
+indexes come from that snapshot when it matches the CSVs; otherwise it is
+built from them and written for the next process (see `snapshot`).
+"""
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from .datastore import STORAGE_BACKEND, get_history, get_jobs, get_workers
+from .pincode_distance import get_area_resolver
+from .rates import get_rate_engine
+from .similarity import get_similarity_index
+from .snapshot import load_or_build
+from .spatial import get_distance_matrix, spatial_index
+
+SNAPSHOT_PATH = os.getenv("GIG_SNAPSHOT") or None
+
+
+def warm(snapshot_path: Optional[str] = SNAPSHOT_PATH) -> Dict[str, float]:
+    """Runs every loading step now; seconds per step."""
+    steps: Dict[str, float] = {}
+
+    def step(name: str, fn: Callable[[], object]) -> None:
+        start = time.perf_counter()
+        fn()
+        steps[name] = time.perf_counter() - start
+
+    if snapshot_path and STORAGE_BACKEND == "csv":
+        step("snapshot", lambda: load_or_build(snapshot_path))
+    step("jobs", get_jobs)
+    step("workers", get_workers)
+    step("history", get_history)
+    step("pincodes", lambda: (get_distance_matrix(), get_area_resolver().resolve("bangalore")))
+    step("spatial", lambda: (spatial_index(get_jobs()), spatial_index(get_workers())))
+    step("rates", get_rate_engine)
+    step("similarity", get_similarity_index)
+    return steps
@@ -0,0 +1,270 @@
+"""
+Rate statistics over `historical_jobs.csv`.
+
+Precomputes min/avg/max and quantiles of `final_rate_charged` per trade and per
+trade x area, plus a keyword -> row inverted index over job descriptions, so
+estimating a rate no longer rescans the whole history.
+"""
+import bisect
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .datastore import HistoricalJob, Table, get_history
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Bumped whenever tokenize() changes: indexes saved with another version are stale.
+TOKENIZER_VERSION = 2
+
+# Words that say nothing about the kind of job; matching on them just adds noise.
+STOPWORDS = frozenset(
+    "a an and are at be by for from has have in is it needs need of on or the to with".split()
+)
+
+
+# (suffix, shortest stem left after removing it); "ag" is "age" once a final e is gone,
+# and needs a longer stem so 'damage' and 'garage' keep theirs.
+_SUFFIXES = (("ation", 3), ("ing", 3), ("ag", 4), ("ed", 3), ("es", 3), ("s", 3))
+
+
+def _stem(token: str) -> str:
+    """Crude suffix stripping so 'leaking'/'leakage'/'leaks' all index as 'leak'.
+
+    A final e goes first, so 'tile'/'tiles' and 'replace'/'replaced' share a
+    stem ('til', 'replac').
+    """
+    if len(token) > 3 and token.endswith("e"):
+        token = token[:-1]
+    for suffix, min_stem in _SUFFIXES:
+        if len(token) - len(suffix) >= min_stem and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed alphanumeric tokens of `text`, without stopwords."""
+    return [_stem(t) for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class RateStats:
+    """Running min/avg/max and quantiles of a set of rates."""
+    __slots__ = ('count', 'total', 'low', 'high', '_sorted')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.low = float('inf')
+        self.high = float('-inf')
+        self._sorted: List[float] = []
+
+    @classmethod
+    def of(cls, rates: Iterable[float]) -> 'RateStats':
+        stats = cls()
+        # One sort instead of an insort per rate
+        stats._sorted = sorted(rates)
+        if stats._sorted:
+            stats.count = len(stats._sorted)
+            stats.total = sum(stats._sorted)
+            stats.low, stats.high = stats._sorted[0], stats._sorted[-1]
+        return stats
+
+    def add(self, rate: float) -> None:
+        self.count += 1
+        self.total += rate
+        self.low = min(self.low, rate)
+        self.high = max(self.high, rate)
+        bisect.insort(self._sorted, rate)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Linear-interpolated quantile, q in [0, 1]."""
+        if not self._sorted:
+            return 0.0
+        pos = (len(self._sorted) - 1) * q
+        lo = int(pos)
+        hi = min(lo + 1, len(self._sorted) - 1)
+        return self._sorted[lo] + (self._sorted[hi] - self._sorted[lo]) * (pos - lo)
+
+    def copy(self) -> 'RateStats':
+        copied = RateStats()
+        copied.count, copied.total, copied.low, copied.high = self.count, self.total, self.low, self.high
+        copied._sorted = list(self._sorted)
+        return copied
+
+    def merge(self, other: 'RateStats') -> 'RateStats':
+        merged = RateStats()
+        merged.count = self.count + other.count
+        merged.total = self.total + other.total
+        merged.low = min(self.low, other.low)
+        merged.high = max(self.high, other.high)
+        merged._sorted = sorted(self._sorted + other._sorted)
+        return merged
+
+
+class RateEngine:
+    """Aggregates and keyword index over historical jobs; supports appends."""
+
+    def __init__(self, rows: Iterable[HistoricalJob] = ()):
+        self.rows: List[HistoricalJob] = []
+        self._row_trade: List[str] = []
+        self._by_trade: Dict[str, RateStats] = {}
+        self._by_trade_area: Dict[Tuple[str, str], RateStats] = {}
+        self._keyword_index: Dict[str, List[int]] = {}
+        self._fill(rows)
+
+    @classmethod
+    def from_keyword_index(cls, rows: Iterable[HistoricalJob],
+                           keyword_index: Dict[str, List[int]]) -> 'RateEngine':
+        """Engine over `rows` with their keyword index built earlier (a
+        snapshot), so no description is tokenized again."""
+        engine = cls()
+        engine._fill(rows, index_keywords=False)
+        engine._keyword_index = keyword_index
+        return engine
+
+    @property
+    def keyword_index(self) -> Dict[str, List[int]]:
+        """Token -> ids of the rows whose description contains it."""
+        return self._keyword_index
+
+    def _fill(self, rows: Iterable[HistoricalJob], index_keywords: bool = True) -> None:
+        """Builds the aggregates and index of an empty engine. Rates are
+        collected per group and sorted once (an insort per row is quadratic)."""
+        by_trade: Dict[str, List[float]] = {}
+        by_trade_area: Dict[Tuple[str, str], List[float]] = {}
+        for row in rows:
+            row_id = len(self.rows)
+            trade = row.trade.lower()
+            self.rows.append(row)
+            self._row_trade.append(trade)
+            by_trade.setdefault(trade, []).append(row.final_rate_charged)
+            by_trade_area.setdefault((trade, row.area.lower()), []).append(row.final_rate_charged)
+            if index_keywords:
+                for token in set(tokenize(row.job_description)):
+                    self._keyword_index.setdefault(token, []).append(row_id)
+        self._by_trade = {key: RateStats.of(rates) for key, rates in by_trade.items()}
+        self._by_trade_area = {key: RateStats.of(rates) for key, rates in by_trade_area.items()}
+
+    def extended(self, rows: Iterable[HistoricalJob]) -> 'RateEngine':
+        """A new engine with `rows` appended, leaving this one untouched for
+        the readers still using it (like `Table.extend`). Stats and keyword
+        lists the new rows change are copied; the rest are shared."""
+        engine = RateEngine()
+        engine.rows = list(self.rows)
+        engine._row_trade = list(self._row_trade)
+        engine._by_trade = dict(self._by_trade)
+        engine._by_trade_area = dict(self._by_trade_area)
+        engine._keyword_index = dict(self._keyword_index)
+        for row in rows:
+            row_id = len(engine.rows)
+            trade = row.trade.lower()
+            engine.rows.append(row)
+            engine._row_trade.append(trade)
+            for groups, shared, key in ((engine._by_trade, self._by_trade, trade),
+                                        (engine._by_trade_area, self._by_trade_area, (trade, row.area.lower()))):
+                stats = groups.get(key)
+                if stats is None or stats is shared.get(key):
+                    stats = groups[key] = stats.copy() if stats else RateStats()
+                stats.add(row.final_rate_charged)
+            for token in set(tokenize(row.job_description)):
+                ids = engine._keyword_index.get(token)
+                if ids is None or ids is self._keyword_index.get(token):
+                    ids = engine._keyword_index[token] = list(ids or ())
+                ids.append(row_id)
+        return engine
+
+    def trade_keys(self, trade: str) -> Set[str]:
+        """Known trades containing `trade` (same loose match as the tools)."""
+        q = trade.lower()
+        return {t for t in self._by_trade if q in t}
+
+    def trade_stats(self, trade: str, area: Optional[str] = None) -> Optional[RateStats]:
+        """Rate stats for every trade matching `trade`, optionally in one area."""
+        keys = self.trade_keys(trade)
+        if area is None:
+            parts = [self._by_trade[k] for k in keys]
+        else:
+            a = area.lower()
+            parts = [self._by_trade_area[(k, a)] for k in keys if (k, a) in self._by_trade_area]
+        if not parts:
+            return None
+        stats = parts[0]
+        for part in parts[1:]:
+            stats = stats.merge(part)
+        return stats
+
+    def keyword_matches(self, trade_keys: Set[str], keywords: Sequence[str]) -> Dict[int, int]:
+        """Row id -> number of `keywords` found in that row, within `trade_keys`."""
+        counts: Dict[int, int] = {}
+        for keyword in set(keywords):
+            for row_id in self._keyword_index.get(keyword, ()):
+                if self._row_trade[row_id] in trade_keys:
+                    counts[row_id] = counts.get(row_id, 0) + 1
+        return counts
+
+    def estimate(self, trade: str, description: str) -> Optional[RateStats]:
+        return self.estimate_many([(trade, description)])[0]
+
+    def estimate_many(self, jobs: Iterable[Tuple[str, str]]) -> List[Optional[RateStats]]:
+        """Rate stats for each (trade, description) pair in one pass.
+
+        Uses history rows sharing a keyword with the description, falling back
+        to the whole trade when none match. Repeated pairs are computed once.
+        """
+        trade_cache: Dict[str, frozenset] = {}
+        memo: Dict[Tuple[frozenset, Tuple[str, ...]], Optional[RateStats]] = {}
+        results: List[Optional[RateStats]] = []
+        for trade, description in jobs:
+            keys = trade_cache.get(trade)
+            if keys is None:
+                keys = trade_cache[trade] = frozenset(self.trade_keys(trade))
+            memo_key = (keys, tuple(sorted(set(tokenize(description)))))
+            if memo_key not in memo:
+                matched = self.keyword_matches(keys, memo_key[1])
+                if matched:
+                    memo[memo_key] = RateStats.of(self.rows[i].final_rate_charged for i in matched)
+                else:
+                    memo[memo_key] = self.trade_stats(trade)
+            results.append(memo[memo_key])
+        return results
+
+
+_engine = RateEngine()
+_engine_table: Optional[Table[HistoricalJob]] = None
+_engine_lock = threading.Lock()
+
+
+def _is_append(old: Table[HistoricalJob], new: Table[HistoricalJob]) -> bool:
+    n = len(old)
+    return 0 < n <= len(new) and old.records[n - 1] == new.records[n - 1] and old.records[0] == new.records[0]
+
+
+def get_rate_engine() -> RateEngine:
+    """Engine in sync with the current history table.
+
+    Appended rows go into a copy of the current engine, which is swapped in
+    whole, so readers never see one half-updated; any other change builds a
+    new engine.
+    """
+    global _engine, _engine_table
+    table = get_history()
+    if table is _engine_table:
+        return _engine
+    with _engine_lock:
+        if table is not _engine_table:
+            if _engine_table is not None and _is_append(_engine_table, table):
+                _engine = _engine.extended(table.records[len(_engine_table):])
+            else:
+                _engine = RateEngine(table.records)
+            _engine_table = table
+        return _engine
+
+
+def prime_rate_engine(engine: RateEngine, table: Table[HistoricalJob]) -> None:
+    """Installs an engine built elsewhere (a snapshot) as the one for `table`."""
+    global _engine, _engine_table
+    with _engine_lock:
+        _engine, _engine_table = engine, table
@@ -0,0 +1,206 @@
+"""
+BM25 similarity search over historical job descriptions.
+
+Postings are stored per (trade, term) as NumPy arrays of trade-local row ids
+and precomputed BM25 weights, so a query only touches rows of the requested
+trade that share a term with it. Scores are summed with `bincount` and the top-k is
+picked with a partial selection (`np.partition`) instead of sorting every match.
+"""
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .datastore import HistoricalJob, Table, get_history
+from .rates import tokenize
+
+
+class BM25Index:
+    """Inverted index with Okapi BM25 weights over `job_description`."""
+
+    def __init__(self, rows: Sequence[HistoricalJob], k1: float = 1.2, b: float = 0.75):
+        self.rows = rows
+        self.trades: List[str] = []
+        trade_codes: Dict[str, int] = {}
+        area_codes: Dict[str, int] = {}
+        n = len(rows)
+        self.trade_code = np.empty(n, dtype=np.int32)
+        self.area_code = np.empty(n, dtype=np.int32)
+        self.difficulty = np.empty(n, dtype=np.int32)
+
+        doc_terms: List[Counter] = []
+        doc_len = np.empty(n, dtype=np.float64)
+        df: Counter = Counter()
+        for i, row in enumerate(rows):
+            trade = row.trade.lower()
+            if trade not in trade_codes:
+                trade_codes[trade] = len(self.trades)
+                self.trades.append(trade)
+            self.trade_code[i] = trade_codes[trade]
+            self.area_code[i] = area_codes.setdefault(row.area.lower(), len(area_codes))
+            self.difficulty[i] = row.difficulty_score
+            terms = Counter(tokenize(row.job_description))
+            doc_terms.append(terms)
+            doc_len[i] = sum(terms.values())
+            df.update(terms.keys())
+        self._area_codes = area_codes
+
+        avgdl = float(doc_len.mean()) if n else 0.0
+        norm = k1 * (1 - b + b * doc_len / avgdl) if avgdl else np.full(n, k1)
+        idf = {t: float(np.log(1 + (n - d + 0.5) / (d + 0.5))) for t, d in df.items()}
+
+        # Rows of each trade in file order; postings refer to positions in these.
+        self._trade_rows = [np.flatnonzero(self.trade_code == c).astype(np.int32)
+                            for c in range(len(self.trades))]
+        local_id = np.empty(n, dtype=np.int32)
+        for rows_of_trade in self._trade_rows:
+            local_id[rows_of_trade] = np.arange(len(rows_of_trade), dtype=np.int32)
+
+        ids: Dict[Tuple[int, str], List[int]] = {}
+        weights: Dict[Tuple[int, str], List[float]] = {}
+        for i, terms in enumerate(doc_terms):
+            code = int(self.trade_code[i])
+            for term, tf in terms.items():
+                key = (code, term)
+                ids.setdefault(key, []).append(int(local_id[i]))
+                weights.setdefault(key, []).append(idf[term] * tf * (k1 + 1) / (tf + norm[i]))
+        self._postings: Dict[Tuple[int, str], Tuple[np.ndarray, np.ndarray]] = {
+            key: (np.array(ids[key], dtype=np.int32), np.array(weights[key], dtype=np.float64))
+            for key in ids
+        }
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def to_arrays(self) -> Tuple[Dict[str, np.ndarray], Dict[str, list]]:
+        """The index as flat arrays plus JSON-serializable lists, for `from_arrays`."""
+        keys = list(self._postings)
+        arrays = {
+            "trade_code": self.trade_code,
+            "area_code": self.area_code,
+            "difficulty": self.difficulty,
+            "trade_rows": np.concatenate(self._trade_rows or [np.empty(0, dtype=np.int32)]),
+            "trade_row_offsets": np.cumsum([0] + [len(r) for r in self._trade_rows], dtype=np.int64),
+            "posting_ids": np.concatenate([self._postings[k][0] for k in keys] or [np.empty(0, dtype=np.int32)]),
+            "posting_weights": np.concatenate([self._postings[k][1] for k in keys] or [np.empty(0)]),
+            "posting_offsets": np.cumsum([0] + [len(self._postings[k][0]) for k in keys], dtype=np.int64),
+        }
+        lists = {"trades": self.trades, "areas": list(self._area_codes),
+                 "posting_codes": [c for c, _ in keys], "posting_terms": [t for _, t in keys]}
+        return arrays, lists
+
+    @classmethod
+    def from_arrays(cls, rows: Sequence[HistoricalJob], arrays: Dict[str, np.ndarray],
+                    lists: Dict[str, list]) -> 'BM25Index':
+        """Index over `rows` from the output of `to_arrays`. The arrays are used
+        as they are (views into them, not copies), so they may be read-only."""
+        index = cls.__new__(cls)
+        index.rows = rows
+        index.trades = list(lists["trades"])
+        index._area_codes = {area: code for code, area in enumerate(lists["areas"])}
+        index.trade_code = arrays["trade_code"]
+        index.area_code = arrays["area_code"]
+        index.difficulty = arrays["difficulty"]
+        bounds = arrays["trade_row_offsets"].tolist()
+        index._trade_rows = [arrays["trade_rows"][bounds[c]:bounds[c + 1]] for c in range(len(index.trades))]
+        bounds = arrays["posting_offsets"].tolist()
+        ids, weights = arrays["posting_ids"], arrays["posting_weights"]
+        index._postings = {
+            (code, term): (ids[bounds[i]:bounds[i + 1]], weights[bounds[i]:bounds[i + 1]])
+            for i, (code, term) in enumerate(zip(lists["posting_codes"], lists["posting_terms"]))
+        }
+        return index
+
+    def search(self, trade: str, query: str, top_k: int = 5, area: Optional[str] = None,
+               min_difficulty: Optional[int] = None,
+               max_difficulty: Optional[int] = None) -> Tuple[List[Tuple[int, float]], int]:
+        """Best matching rows for `query` within a trade.
+
+        Returns ([(row id, score)] best first, total number of matching rows).
+        With no query terms every row of the trade matches with score 0, in
+        file order.
+        """
+        q = trade.lower()
+        codes = [c for c, t in enumerate(self.trades) if q in t]
+        terms = set(tokenize(query))
+        if not codes:
+            return [], 0
+
+        if terms:
+            id_parts, score_parts = [], []
+            for c in codes:
+                parts = [self._postings[(c, t)] for t in terms if (c, t) in self._postings]
+                if not parts:
+                    continue
+                if len(parts) == 1:
+                    id_parts.append(self._trade_rows[c][parts[0][0]])
+                    score_parts.append(parts[0][1])
+                    continue
+                # Dense accumulator over this trade's rows; BM25 weights are > 0.
+                trade_scores = np.bincount(np.concatenate([p[0] for p in parts]),
+                                           weights=np.concatenate([p[1] for p in parts]),
+                                           minlength=len(self._trade_rows[c]))
+                local = np.flatnonzero(trade_scores)
+                id_parts.append(self._trade_rows[c][local])
+                score_parts.append(trade_scores[local])
+            if not id_parts:
+                return [], 0
+            ids = np.concatenate(id_parts)
+            scores = np.concatenate(score_parts)
+            if len(id_parts) > 1:
+                order = np.argsort(ids, kind='stable')
+                ids, scores = ids[order], scores[order]
+        else:
+            ids = np.sort(np.concatenate([self._trade_rows[c] for c in codes]))
+            scores = np.zeros(len(ids))
+
+        mask = None
+        if area is not None:
+            area_code = self._area_codes.get(area.lower(), -1)
+            mask = self.area_code[ids] == area_code
+        if min_difficulty is not None:
+            m = self.difficulty[ids] >= min_difficulty
+            mask = m if mask is None else mask & m
+        if max_difficulty is not None:
+            m = self.difficulty[ids] <= max_difficulty
+            mask = m if mask is None else mask & m
+        if mask is not None:
+            ids, scores = ids[mask], scores[mask]
+
+        total = len(ids)
+        if total == 0 or top_k <= 0:
+            return [], total
+        if total > top_k:
+            # k-th best score; ties at the cut go to the earliest rows (ids are sorted).
+            kth = np.partition(scores, total - top_k)[total - top_k]
+            above = np.flatnonzero(scores > kth)
+            tied = np.flatnonzero(scores == kth)[:top_k - len(above)]
+            keep = np.concatenate([above, tied])
+            ids, scores = ids[keep], scores[keep]
+        # Best score first; ties in file order.
+        order = np.lexsort((ids, -scores))
+        return [(int(ids[i]), float(scores[i])) for i in order], total
+
+
+_index: Optional[BM25Index] = None
+_index_table: Optional[Table[HistoricalJob]] = None
+_lock = threading.Lock()
+
+
+def get_similarity_index() -> BM25Index:
+    """Index over the current history table, rebuilt when the file changes."""
+    global _index, _index_table
+    table = get_history()
+    if table is not _index_table:
+        with _lock:
+            if table is not _index_table:
+                _index, _index_table = BM25Index(table.records), table
+    return _index
+
+
+def prime_similarity_index(index: BM25Index, table: Table[HistoricalJob]) -> None:
+    """Installs an index built elsewhere (a snapshot) as the one for `table`."""
+    global _index, _index_table
+    with _lock:
+        _index, _index_table = index, table
@@ -0,0 +1,258 @@
+"""
+Read-only snapshot of the loaded CSVs and their text indexes in one file.
+
+Parsing the CSVs and tokenizing every history description (rate engine, BM25
+index) is most of a cold start. `build()` writes the tables as columns and
+the indexes as flat NumPy arrays; `load()` maps the file and installs them
+without parsing or tokenizing anything. The BM25 arrays are used straight from
+the mapping, so worker processes that load the same file share those pages
+instead of each holding a copy. Records and the dict-based indexes (trade,
+pincode, keyword) are rebuilt from the mapped columns, which is still several
+times faster than parsing.
+
+A snapshot records the path, size and mtime of each CSV it came from and is
+ignored once any of them changes. CSV storage only.
+
+    python -m my_agent.snapshot --out my_agent/gig_snapshot.bin
+
+Layout: magic, header length, JSON header (array dtypes, shapes and offsets,
+plus metadata), then the raw arrays, each aligned to 64 bytes.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from dataclasses import fields
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from . import datastore
+from .datastore import HistoricalJob, Job, Worker, get_history, get_jobs, get_workers
+from .rates import TOKENIZER_VERSION, RateEngine, prime_rate_engine
+from .similarity import BM25Index, prime_similarity_index
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent builders just each write the file
+    fcntl = None
+
+_MAGIC = b"GIGSNAP1"
+_ALIGN = 64
+FORMAT_VERSION = 1
+
+# Snapshot name -> record type
+_TABLES = {"jobs": Job, "workers": Worker, "history": HistoricalJob}
+
+
+def _sources():
+    # Looked up on use: `set_data_dir` repoints them.
+    return {"jobs": datastore.jobs_source, "workers": datastore.workers_source,
+            "history": datastore.history_source}
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _file_stamp(path: str) -> Tuple[int, int]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+# --- File format ---
+
+def write_arrays(path: str, arrays: Dict[str, np.ndarray], meta: dict) -> None:
+    """Writes `arrays` and `meta` to `path`, replacing it atomically."""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        layout[name] = (array.dtype.str, list(array.shape), offset)
+        offset += array.nbytes
+    header = json.dumps({"arrays": layout, "meta": meta}).encode("utf-8")
+    data_start = _aligned(len(_MAGIC) + 8 + len(header))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][2])
+            f.write(np.ascontiguousarray(array).data)
+        f.truncate(data_start + _aligned(offset))
+    os.replace(tmp_path, path)
+
+
+def read_arrays(path: str) -> Tuple[Dict[str, np.ndarray], dict]:
+    """(arrays, meta) from a file written by `write_arrays`. The arrays are
+    read-only views of the mapped file. ValueError if it is not one."""
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buf[:len(_MAGIC)] != _MAGIC:
+        raise ValueError(f"Not a snapshot file: {path}")
+    (header_len,) = struct.unpack("<Q", buf[len(_MAGIC):len(_MAGIC) + 8])
+    header = json.loads(buf[len(_MAGIC) + 8:len(_MAGIC) + 8 + header_len])
+    data_start = _aligned(len(_MAGIC) + 8 + header_len)
+    arrays = {}
+    for name, (dtype, shape, offset) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        if count == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+            continue
+        # Each array keeps the mapping alive; it is never closed explicitly.
+        arrays[name] = np.frombuffer(buf, dtype=dtype, count=count, offset=data_start + offset).reshape(shape)
+    return arrays, header["meta"]
+
+
+# --- Tables ---
+
+def _columns(name: str, records, record_type: type) -> Dict[str, np.ndarray]:
+    """One array per field: NUL-joined UTF-8 for strings, numbers as they are."""
+    arrays = {}
+    for f in fields(record_type):
+        values = [getattr(r, f.name) for r in records]
+        key = f"{name}.{f.name}"
+        if f.type is str:
+            joined = "\0".join(values)
+            if joined.count("\0") != max(len(values) - 1, 0):
+                raise ValueError(f"{key} has a NUL character, cannot snapshot it")
+            arrays[key] = np.frombuffer(joined.encode("utf-8"), dtype=np.uint8)
+        else:
+            arrays[key] = np.array(values, dtype={bool: np.bool_, int: np.int64, float: np.float64}[f.type])
+    return arrays
+
+
+def _records(name: str, record_type: type, arrays: Dict[str, np.ndarray], count: int) -> tuple:
+    if count == 0:
+        return ()
+    columns = []
+    for f in fields(record_type):
+        column = arrays[f"{name}.{f.name}"]
+        columns.append(column.tobytes().decode("utf-8").split("\0") if f.type is str else column.tolist())
+    return tuple(map(record_type, *columns))
+
+
+# --- Keyword index ---
+
+def _keyword_arrays(index: Dict[str, List[int]]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    tokens = list(index)
+    arrays = {
+        "rates.keyword_rows": np.array([i for t in tokens for i in index[t]], dtype=np.int32),
+        "rates.keyword_offsets": np.cumsum([0] + [len(index[t]) for t in tokens], dtype=np.int64),
+    }
+    return arrays, tokens
+
+
+def _keyword_index(arrays: Dict[str, np.ndarray], tokens: List[str]) -> Dict[str, List[int]]:
+    # Lists, not array views: the engine appends to them as history grows.
+    rows = arrays["rates.keyword_rows"].tolist()
+    bounds = arrays["rates.keyword_offsets"].tolist()
+    return {t: rows[bounds[i]:bounds[i + 1]] for i, t in enumerate(tokens)}
+
+
+# --- Build / load ---
+
+def build(path: str) -> Dict[str, int]:
+    """Snapshots the current tables and their indexes to `path`; rows per table."""
+    if datastore.STORAGE_BACKEND != "csv":
+        raise RuntimeError("Snapshots only apply to GIG_STORAGE=csv")
+    tables = {"jobs": get_jobs(), "workers": get_workers(), "history": get_history()}
+    sources = _sources()
+    arrays: Dict[str, np.ndarray] = {}
+    meta: dict = {"format": FORMAT_VERSION, "tokenizer": TOKENIZER_VERSION, "tables": {}}
+    for name, table in tables.items():
+        arrays.update(_columns(name, table.records, _TABLES[name]))
+        meta["tables"][name] = {"path": os.path.abspath(sources[name].path),
+                                "stamp": list(table.stamp), "rows": len(table)}
+    # Built here rather than taken from the live ones, which may already be on a newer table.
+    history = tables["history"].records
+    bm25_arrays, meta["bm25"] = BM25Index(history).to_arrays()
+    arrays.update({f"bm25.{k}": v for k, v in bm25_arrays.items()})
+    keyword_arrays, meta["rate_keywords"] = _keyword_arrays(RateEngine(history).keyword_index)
+    arrays.update(keyword_arrays)
+    write_arrays(path, arrays, meta)
+    return {name: len(table) for name, table in tables.items()}
+
+
+def load(path: str) -> bool:
+    """Installs the tables and indexes from the snapshot at `path`. False if
+    the file is missing, unreadable or older than any of the CSVs."""
+    if datastore.STORAGE_BACKEND != "csv":
+        return False
+    try:
+        arrays, meta = read_arrays(path)
+    except (OSError, ValueError):
+        return False
+    if meta.get("format") != FORMAT_VERSION or meta.get("tokenizer") != TOKENIZER_VERSION:
+        return False
+    sources = _sources()
+    for name, source in sources.items():
+        entry = meta["tables"][name]
+        if entry["path"] != os.path.abspath(source.path) or tuple(entry["stamp"]) != _file_stamp(source.path):
+            return False
+
+    records = {name: _records(name, _TABLES[name], arrays, meta["tables"][name]["rows"]) for name in sources}
+    for name, source in sources.items():
+        # The file may still change between the check above and here.
+        if not source.prime(records[name], tuple(meta["tables"][name]["stamp"])):
+            return False
+    history = get_history()
+    if history.records is not records["history"]:
+        return False
+    bm25_arrays = {k[len("bm25."):]: v for k, v in arrays.items() if k.startswith("bm25.")}
+    prime_similarity_index(BM25Index.from_arrays(history.records, bm25_arrays, meta["bm25"]), history)
+    engine = RateEngine.from_keyword_index(history.records, _keyword_index(arrays, meta["rate_keywords"]))
+    prime_rate_engine(engine, history)
+    return True
+
+
+@contextmanager
+def _build_lock(path: str) -> Iterator[None]:
+    """Held by one process at a time, so workers starting together build once."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_or_build(path: str) -> bool:
+    """Loads the snapshot at `path`, (re)building it first when it is missing
+    or stale. True if an existing snapshot was used as it was."""
+    if load(path):
+        return True
+    with _build_lock(path):
+        # Another worker may have written it while this one waited.
+        if load(path):
+            return True
+        build(path)
+    # Swap the freshly parsed data for the mapped copy other workers share.
+    load(path)
+    return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a snapshot of the gig CSVs and their indexes.")
+    parser.add_argument("--out", required=True, help="snapshot file (replaced if it exists)")
+    parser.add_argument("--data-dir", default=None,
+                        help="directory with gig_jobs.csv, historical_jobs.csv and worker_profiles.csv")
+    args = parser.parse_args()
+    if args.data_dir:
+        datastore.set_data_dir(args.data_dir)
+    for name, count in build(args.out).items():
+        print(f"{name}: {count} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Spatial lookups on top of `PINCODE_COORDS`.
+
+`DistanceMatrix` precomputes every pincode-to-pincode distance as a NumPy
+array (flat-earth like `get_distance`, or haversine). `SpatialIndex` buckets the
+pincodes of a table into a coordinate grid, so a "within range_km of X" query
+only looks at nearby cells and returns rows sorted by distance.
+"""
+import math
+import os
+import threading
+from typing import Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from .datastore import Table
+from .pincode_distance import BANGALORE_CENTER, PINCODE_COORDS
+
+KM_PER_DEG = 111.0
+LON_SCALE = 0.97  # cos(~13 deg), Bangalore latitude
+EARTH_RADIUS_KM = 6371.0
+
+# "flat" matches pincode_distance.get_distance; "haversine" is exact great-circle.
+DISTANCE_METRIC = os.environ.get("GIG_DISTANCE_METRIC", "flat")
+
+# Pseudo-pincode for unmapped Bangalore ('56xxxx') codes, placed at the city center.
+_CENTER = "__center__"
+
+
+class DistanceMatrix:
+    """All-pairs distances between known pincodes."""
+
+    def __init__(self, coords: Dict[str, Tuple[float, float]] = PINCODE_COORDS,
+                 metric: str = "flat"):
+        if metric not in ("flat", "haversine"):
+            raise ValueError(f"Unknown metric: {metric}")
+        self.metric = metric
+        self.pincodes: List[str] = list(coords) + [_CENTER]
+        self.index: Dict[str, int] = {p: i for i, p in enumerate(self.pincodes)}
+        points = np.array(list(coords.values()) + [BANGALORE_CENTER], dtype=np.float64)
+        self.lat = points[:, 0]
+        self.lon = points[:, 1]
+        self.matrix = self._pairwise(self.lat, self.lon)
+
+    def _pairwise(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        if self.metric == "flat":
+            dy = (lat[:, None] - lat[None, :]) * KM_PER_DEG
+            dx = (lon[:, None] - lon[None, :]) * KM_PER_DEG * LON_SCALE
+            return np.sqrt(dy ** 2 + dx ** 2)
+        phi = np.radians(lat)
+        dphi = phi[:, None] - phi[None, :]
+        dlmb = np.radians(lon)[:, None] - np.radians(lon)[None, :]
+        a = np.sin(dphi / 2) ** 2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(dlmb / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    def index_of(self, pincode: str) -> Optional[int]:
+        """Matrix row for a pincode; unmapped '56' codes fall back to the city center."""
+        i = self.index.get(pincode)
+        if i is None and pincode and pincode.startswith('56'):
+            return self.index[_CENTER]
+        return i
+
+    def coords(self, pincode: str) -> Optional[Tuple[float, float]]:
+        i = self.index_of(pincode)
+        return None if i is None else (float(self.lat[i]), float(self.lon[i]))
+
+    def distance(self, pincode1: str, pincode2: str) -> float:
+        i, j = self.index_of(pincode1), self.index_of(pincode2)
+        if i is None or j is None:
+            return float('inf')
+        return float(self.matrix[i, j])
+
+    def distances_from(self, pincode: str, others: Sequence[str]) -> np.ndarray:
+        """Distances from `pincode` to each of `others` (inf where unknown)."""
+        out = np.full(len(others), np.inf)
+        i = self.index_of(pincode)
+        if i is None:
+            return out
+        cols = np.array([-1 if (j := self.index_of(p)) is None else j for p in others], dtype=np.int64)
+        known = cols >= 0
+        out[known] = self.matrix[i, cols[known]]
+        return out
+
+
+R = TypeVar('R')
+
+
+class SpatialIndex(Generic[R]):
+    """Grid buckets of a table's pincodes for radius queries."""
+
+    def __init__(self, table: Table[R], matrix: DistanceMatrix, cell_km: float = 5.0):
+        self.table = table
+        self.matrix = matrix
+        self.cell_km = cell_km
+        self._cells: Dict[Tuple[int, int], List[str]] = {}
+        for pincode in table.by_pincode:
+            point = matrix.coords(pincode)
+            if point is not None:
+                self._cells.setdefault(self._cell(*point), []).append(pincode)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat * KM_PER_DEG / self.cell_km),
+                math.floor(lon * KM_PER_DEG * LON_SCALE / self.cell_km))
+
+    def _nearby_pincodes(self, lat: float, lon: float, range_km: float) -> List[str]:
+        # One extra ring of cells covers the difference between the grid's
+        # flat projection and a haversine metric.
+        reach = int(math.ceil(range_km / self.cell_km)) + 1
+        cy, cx = self._cell(lat, lon)
+        found: List[str] = []
+        for dy in range(-reach, reach + 1):
+            for dx in range(-reach, reach + 1):
+                found.extend(self._cells.get((cy + dy, cx + dx), ()))
+        return found
+
+    def within(self, pincode: str, range_km: float) -> List[Tuple[float, int]]:
+        """(distance, row position) of rows within `range_km`, nearest first.
+
+        Rows at the same distance stay in file order.
+        """
+        origin = self.matrix.coords(pincode)
+        if origin is None:
+            return []
+        candidates = self._nearby_pincodes(origin[0], origin[1], range_km)
+        if not candidates:
+            return []
+        dists = self.matrix.distances_from(pincode, candidates)
+        hits: List[Tuple[float, int]] = []
+        for p, d in zip(candidates, dists.tolist()):
+            if d <= range_km:
+                hits.extend((d, i) for i in self.table.by_pincode[p])
+        hits.sort()
+        return hits
+
+
+_matrices: Dict[str, DistanceMatrix] = {}
+_indexes: Dict[int, SpatialIndex] = {}
+_MAX_INDEXES = 8  # a few live snapshots (jobs, workers) plus ones just replaced
+_lock = threading.Lock()
+
+
+def get_distance_matrix(metric: str = DISTANCE_METRIC) -> DistanceMatrix:
+    matrix = _matrices.get(metric)
+    if matrix is None:
+        with _lock:
+            matrix = _matrices.get(metric)
+            if matrix is None:
+                matrix = _matrices[metric] = DistanceMatrix(metric=metric)
+    return matrix
+
+
+def pincode_distances(pincode: str, others: Sequence[str], range_km: float) -> Dict[str, float]:
+    """Distance from `pincode` to each of `others` that is within `range_km`."""
+    dists = get_distance_matrix().distances_from(pincode, others)
+    return {p: d for p, d in zip(others, dists.tolist()) if d <= range_km}
+
+
+def spatial_index(table: Table[R]) -> SpatialIndex[R]:
+    """Grid index for `table`, built once per loaded snapshot."""
+    index = _indexes.get(id(table))
+    if index is None or index.table is not table:
+        index = SpatialIndex(table, get_distance_matrix())
+        with _lock:
+            _indexes.pop(id(table), None)
+            _indexes[id(table)] = index
+            # Oldest entries belong to snapshots that have since been reloaded.
+            while len(_indexes) > _MAX_INDEXES:
+                del _indexes[next(iter(_indexes))]
+    return index
@@ -0,0 +1,217 @@
+"""
+SQLite storage for jobs, workers and history (GIG_STORAGE=sqlite).
+
+Each data set lives in an indexed table (trade, pincode, availability,
+urgency). Rows can be appended or upserted one at a time instead of rewriting
+a CSV, and searches run as indexed queries. Triggers bump a per-table version
+on every write, which is what the tool caches key on; the full in-memory
+`Table` snapshot is only rebuilt when something needs every row (rate stats,
+similarity search, job listings).
+
+One-shot import from the CSVs:
+
+    python -m my_agent.sqlite_store --db my_agent/gig_data.db --csv-dir my_agent
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+from dataclasses import astuple, fields
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from .datastore import HistoricalJob, Job, Table, Worker
+
+R = TypeVar('R')
+
+# (table, record type, primary key, trade column, pincode column, other indexes)
+_SCHEMAS: Tuple[Tuple[str, type, str, str, str, Tuple[Tuple[str, ...], ...]], ...] = (
+    ('jobs', Job, 'job_id', 'required_trade', 'location_zip', (('urgency_level',),)),
+    ('history', HistoricalJob, 'historical_id', 'trade', 'location_zip', ()),
+    ('workers', Worker, 'worker_id', 'trade', 'service_area_zip', (('trade', 'is_available', 'service_area_zip'),)),
+)
+
+_SQL_TYPES = {str: 'TEXT', int: 'INTEGER', float: 'REAL', bool: 'INTEGER'}
+
+CSV_FILES = {'jobs': 'gig_jobs.csv', 'history': 'historical_jobs.csv', 'workers': 'worker_profiles.csv'}
+_PARSERS: Dict[str, Callable[[Dict[str, str]], object]] = {
+    'jobs': Job.from_row, 'history': HistoricalJob.from_row, 'workers': Worker.from_row,
+}
+
+
+def _schema_sql(table: str, record: type, key: str, trade: str, pincode: str,
+                indexes: Tuple[Tuple[str, ...], ...]) -> List[str]:
+    columns = ', '.join(f"{f.name} {_SQL_TYPES[f.type]}{' NOT NULL' if f.name == key else ''}"
+                        for f in fields(record))
+    statements = [
+        # Keeps a rowid: it is the insertion (file) order that results are sorted by.
+        f"CREATE TABLE IF NOT EXISTS {table} ({columns}, PRIMARY KEY ({key}))",
+        f"CREATE INDEX IF NOT EXISTS {table}_trade ON {table} ({trade}, {pincode})",
+        f"CREATE INDEX IF NOT EXISTS {table}_pincode ON {table} ({pincode})",
+    ]
+    statements += [f"CREATE INDEX IF NOT EXISTS {table}_{'_'.join(cols)} ON {table} ({', '.join(cols)})"
+                   for cols in indexes]
+    statements.append(f"INSERT OR IGNORE INTO data_version (name, version) VALUES ('{table}', 0)")
+    for op in ('INSERT', 'UPDATE', 'DELETE'):
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_{op.lower()}_version AFTER {op} ON {table} "
+            f"BEGIN UPDATE data_version SET version = version + 1 WHERE name = '{table}'; END")
+    return statements
+
+
+class SqliteDb:
+    """Connection per thread to one database file, with the schema in place."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self.created = not os.path.exists(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self.connect()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS data_version (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            for schema in _SCHEMAS:
+                for statement in _schema_sql(*schema):
+                    conn.execute(statement)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            # WAL lets searches run while ingestion writes.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def version(self, table: str) -> int:
+        row = self.connect().execute("SELECT version FROM data_version WHERE name = ?", (table,)).fetchone()
+        return row[0] if row else 0
+
+    def upsert(self, table: str, records: Iterable[object]) -> int:
+        """Inserts records, replacing any with the same id in place (keeping their position)."""
+        record_type, key = next((s[1], s[2]) for s in _SCHEMAS if s[0] == table)
+        names = [f.name for f in fields(record_type)]
+        updates = ', '.join(f"{n} = excluded.{n}" for n in names if n != key)
+        sql = (f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+               f"ON CONFLICT ({key}) DO UPDATE SET {updates}")
+        conn = self.connect()
+        with conn:
+            cursor = conn.executemany(sql, (astuple(r) for r in records))
+        return cursor.rowcount
+
+    def update(self, table: str, key: str, changes: Dict[str, object]) -> bool:
+        """Changes some columns of the row with primary key `key`; False if there is none."""
+        key_column = next(s[2] for s in _SCHEMAS if s[0] == table)
+        assignments = ', '.join(f"{column} = ?" for column in changes)
+        conn = self.connect()
+        with conn:
+            cursor = conn.execute(f"UPDATE {table} SET {assignments} WHERE {key_column} = ?",
+                                  (*changes.values(), key))
+        return cursor.rowcount > 0
+
+    def import_csvs(self, csv_dir: str) -> Dict[str, int]:
+        """Loads the three CSV files in `csv_dir` (any that exist), in file order."""
+        counts = {}
+        for table, filename in CSV_FILES.items():
+            path = os.path.join(csv_dir, filename)
+            if not os.path.exists(path):
+                continue
+            with open(path, mode='r', encoding='utf-8') as f:
+                counts[table] = self.upsert(table, (_PARSERS[table](row) for row in csv.DictReader(f)))
+        return counts
+
+
+class SqliteSource(Generic[R]):
+    """One table of a SqliteDb, with the same `get()` as CsvSource plus indexed queries."""
+
+    def __init__(self, db: SqliteDb, table: str, record: Type[R], key_field: str,
+                 trade_field: str, pincode_field: str):
+        self.db = db
+        self.table = table
+        self.key_field = key_field
+        self.trade_field = trade_field
+        self.pincode_field = pincode_field
+        self._names = [f.name for f in fields(record)]
+        bools = frozenset(i for i, f in enumerate(fields(record)) if f.type is bool)
+        self._make = (lambda row: record(*row)) if not bools else (
+            lambda row: record(*(bool(v) if i in bools else v for i, v in enumerate(row))))
+        self._lock = threading.Lock()
+        self._table: Table[R] = Table((), trade_field, pincode_field, stamp=(-1, -1))
+        # Distinct trade and pincode values, refreshed per version.
+        self._distinct: Dict[str, Tuple[int, List[str]]] = {}
+
+    def version(self) -> int:
+        return self.db.version(self.table)
+
+    def get(self) -> Table[R]:
+        """Snapshot of every row, rebuilt when the table has changed."""
+        version = self.version()
+        table = self._table
+        if table.stamp == (version, 0):
+            return table
+        with self._lock:
+            if self._table.stamp != (version, 0):
+                rows = self.db.connect().execute(
+                    f"SELECT {', '.join(self._names)} FROM {self.table} ORDER BY rowid").fetchall()
+                self._table = Table(tuple(self._make(r) for r in rows), self.trade_field, self.pincode_field,
+                                    stamp=(version, 0), version=version)
+            return self._table
+
+    def upsert(self, records: Sequence[R]) -> int:
+        return self.db.upsert(self.table, records)
+
+    def update(self, key: str, **changes: object) -> bool:
+        return self.db.update(self.table, key, changes)
+
+    def _distinct_values(self, column: str) -> List[str]:
+        version = self.version()
+        cached = self._distinct.get(column)
+        if cached is None or cached[0] != version:
+            # Served from the column's index
+            values = [r[0] for r in self.db.connect().execute(f"SELECT DISTINCT {column} FROM {self.table}")]
+            cached = self._distinct[column] = (version, values)
+        return cached[1]
+
+    def trades_matching(self, query: str) -> List[str]:
+        """Stored trade names containing `query` (case-insensitive), as Table.match_trade does."""
+        q = query.lower()
+        return [t for t in self._distinct_values(self.trade_field) if q in t.lower()]
+
+    def pincodes(self) -> List[str]:
+        return self._distinct_values(self.pincode_field)
+
+    def select(self, trade_query: str, pincodes: Optional[Sequence[str]] = None,
+               **equals: object) -> List[Tuple[int, R]]:
+        """(rowid, record) in insertion order for rows of a matching trade,
+        optionally within `pincodes` and with columns equal to `equals`."""
+        trades = self.trades_matching(trade_query)
+        if not trades or pincodes is not None and not pincodes:
+            return []
+        where = [f"{self.trade_field} IN ({', '.join('?' * len(trades))})"]
+        params: List[object] = list(trades)
+        for column, value in equals.items():
+            where.append(f"{column} = ?")
+            params.append(value)
+        if pincodes is not None:
+            where.append(f"{self.pincode_field} IN ({', '.join('?' * len(pincodes))})")
+            params.extend(pincodes)
+        sql = (f"SELECT rowid, {', '.join(self._names)} FROM {self.table} "
+               f"WHERE {' AND '.join(where)} ORDER BY rowid")
+        return [(row[0], self._make(row[1:])) for row in self.db.connect().execute(sql, params)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import the gig CSV files into a SQLite database.")
+    parser.add_argument('--db', required=True, help="database file (created if missing)")
+    parser.add_argument('--csv-dir', default=os.path.dirname(os.path.abspath(__file__)),
+                        help="directory with gig_jobs.csv, historical_jobs.csv and worker_profiles.csv")
+    args = parser.parse_args()
+    counts = SqliteDb(args.db).import_csvs(args.csv_dir)
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""
+Latency breakdown for chat turns.
+
+`instrument(agent)` hooks before/after callbacks onto every agent in a tree and
+records each agent run, LLM call (with token counts), tool call (arguments,
+rows scanned, result size) and agent transfer as Prometheus metrics and as
+spans of the current `RequestTrace`, if one was started for the request.
+History compaction reports each LLM call's prompt size before and after
+through `record_context`.
+"""
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40)
+
+AGENT_SECONDS = Histogram("gig_agent_run_seconds", "Time spent in one agent run, sub-agents included",
+                          ["agent"], buckets=_LATENCY_BUCKETS)
+LLM_SECONDS = Histogram("gig_llm_call_seconds", "LLM call latency", ["agent", "model"], buckets=_LATENCY_BUCKETS)
+LLM_TOKENS = Counter("gig_llm_tokens_total", "LLM tokens used", ["agent", "kind"])
+LLM_PROMPT_TOKENS = Histogram("gig_llm_prompt_tokens", "Prompt tokens per LLM call", ["agent"],
+                              buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000))
+CONTEXT_TOKENS = Histogram("gig_context_tokens", "Estimated prompt tokens per LLM call, before and after "
+                           "history compaction", ["agent", "stage"],
+                           buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000))
+TOOL_SECONDS = Histogram("gig_tool_call_seconds", "Tool call latency", ["tool"], buckets=_LATENCY_BUCKETS)
+TOOL_ROWS = Histogram("gig_tool_rows_scanned", "Data rows examined per tool call", ["tool"],
+                      buckets=(0, 10, 100, 1000, 10_000, 100_000, 1_000_000))
+TOOL_RESULT_CHARS = Histogram("gig_tool_result_chars", "Size of a tool's output in characters", ["tool"],
+                              buckets=(100, 500, 1000, 4000, 16000, 64000, 256000))
+TRANSFERS = Counter("gig_agent_transfers_total", "Hand-offs between agents", ["from_agent", "to_agent"])
+CHAT_SECONDS = Histogram("gig_chat_request_seconds", "End-to-end chat request latency", ["endpoint"],
+                         buckets=_LATENCY_BUCKETS)
+
+
+@dataclass
+class Span:
+    kind: str  # "agent", "llm", "tool", "transfer" or "context"
+    name: str
+    start: float  # seconds since the request started
+    seconds: float = 0.0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RequestTrace:
+    """Spans recorded while serving one request."""
+    started: float = field(default_factory=time.perf_counter)
+    spans: List[Span] = field(default_factory=list)
+    # Agents that have started but not finished. An agent that hands off to a
+    # sub-agent gets no after-callback, so its run ends with the request.
+    open_agents: Dict[str, float] = field(default_factory=dict)
+
+    def finish(self) -> None:
+        """Closes the spans of agents still running at the end of the request."""
+        for agent, started in list(self.open_agents.items()):
+            _close_agent(self, agent, started)
+        self.open_agents.clear()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def totals(self) -> Dict[str, float]:
+        """Seconds in LLM calls and in tools, out of the total. (Agent spans
+        nest and would count the same time twice.)"""
+        totals: Dict[str, float] = {"total": self.elapsed(), "llm": 0.0, "tool": 0.0}
+        for span in self.spans:
+            if span.kind in totals:
+                totals[span.kind] += span.seconds
+        return totals
+
+    def context_tokens(self) -> Tuple[int, int]:
+        """Estimated prompt tokens over the request's LLM calls, before and after compaction."""
+        spans = [s for s in self.spans if s.kind == "context"]
+        return sum(s.attrs["tokens_before"] for s in spans), sum(s.attrs["tokens_after"] for s in spans)
+
+    def server_timing(self) -> str:
+        """Value for a `Server-Timing` response header."""
+        totals = self.totals()
+        counts: Dict[str, int] = {}
+        for span in self.spans:
+            counts[span.kind] = counts.get(span.kind, 0) + 1
+        parts = []
+        for kind, seconds in totals.items():
+            desc = f';desc="{counts[kind]} calls"' if kind in counts else ""
+            parts.append(f"{kind};dur={seconds * 1000:.1f}{desc}")
+        return ", ".join(parts)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "totals_ms": {kind: round(seconds * 1000, 1) for kind, seconds in self.totals().items()},
+            "spans": [{"kind": s.kind, "name": s.name, "start_ms": round(s.start * 1000, 1),
+                       "ms": round(s.seconds * 1000, 1), **s.attrs} for s in self.spans],
+        }
+
+
+_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("gig_trace", default=None)
+# Rows-scanned counter of the tool call in progress; tools run in a copy of the caller's context.
+_tool_rows: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("gig_tool_rows", default=None)
+
+# Start times of LLM and tool calls in flight, keyed by invocation, agent and call. Calls
+# that never finish (errors, short-circuiting callbacks) age out past the cap.
+_pending: "OrderedDict[Tuple[str, ...], Tuple[float, Any]]" = OrderedDict()
+_pending_lock = threading.Lock()
+_MAX_PENDING = 4096
+
+
+def start_trace() -> RequestTrace:
+    """Starts collecting spans for the current request (task)."""
+    trace = RequestTrace()
+    _trace.set(trace)
+    return trace
+
+
+def record_rows(count: int) -> None:
+    """Called by tools to report how many data rows a call examined."""
+    rows = _tool_rows.get()
+    if rows is not None:
+        rows[0] += count
+
+
+def record_context(agent: str, tokens_before: int, tokens_after: int, **attrs: Any) -> None:
+    """Called by history compaction with the estimated prompt size of an LLM call."""
+    CONTEXT_TOKENS.labels(agent, "before").observe(tokens_before)
+    CONTEXT_TOKENS.labels(agent, "after").observe(tokens_after)
+    trace = _trace.get()
+    if trace is not None:
+        trace.spans.append(Span("context", agent, time.perf_counter() - trace.started,
+                                attrs={"tokens_before": tokens_before, "tokens_after": tokens_after, **attrs}))
+
+
+def _begin(key: Tuple[str, ...], extra: Any = None) -> None:
+    with _pending_lock:
+        _pending[key] = (time.perf_counter(), extra)
+        if len(_pending) > _MAX_PENDING:
+            _pending.popitem(last=False)
+
+
+def _end(key: Tuple[str, ...]) -> Tuple[Optional[float], Any]:
+    """(start time, extra) of the call begun under `key`."""
+    with _pending_lock:
+        return _pending.pop(key, (None, None))
+
+
+def _add_span(kind: str, name: str, started: float, **attrs: Any) -> float:
+    seconds = time.perf_counter() - started
+    trace = _trace.get()
+    if trace is not None:
+        trace.spans.append(Span(kind, name, started - trace.started, seconds, attrs))
+    return seconds
+
+
+def _short(value: Any, limit: int = 200) -> Any:
+    text = value if isinstance(value, str) else repr(value)
+    return value if len(text) <= limit else text[:limit] + "..."
+
+
+# --- ADK callbacks ---
+
+def _close_agent(trace: RequestTrace, agent: str, started: float) -> None:
+    seconds = time.perf_counter() - started
+    trace.spans.append(Span("agent", agent, started - trace.started, seconds))
+    AGENT_SECONDS.labels(agent).observe(seconds)
+
+
+def before_agent(callback_context) -> None:
+    # Agent runs are only timed within a request trace, which closes the ones that hand off.
+    trace = _trace.get()
+    if trace is not None:
+        trace.open_agents[callback_context.agent_name] = time.perf_counter()
+
+
+def after_agent(callback_context) -> None:
+    trace = _trace.get()
+    started = trace.open_agents.pop(callback_context.agent_name, None) if trace is not None else None
+    if started is not None:
+        _close_agent(trace, callback_context.agent_name, started)
+
+
+def before_model(callback_context, llm_request) -> None:
+    _begin((callback_context.invocation_id, callback_context.agent_name, "llm"), llm_request.model or "")
+
+
+def after_model(callback_context, llm_response) -> None:
+    if llm_response.partial:
+        return  # streamed chunk; the call ends with the final response
+    agent = callback_context.agent_name
+    started, model = _end((callback_context.invocation_id, agent, "llm"))
+    if started is None:
+        return
+    usage = llm_response.usage_metadata
+    prompt_tokens = (usage.prompt_token_count or 0) if usage else 0
+    response_tokens = (usage.candidates_token_count or 0) if usage else 0
+    seconds = _add_span("llm", agent, started, model=model, prompt_tokens=prompt_tokens,
+                        response_tokens=response_tokens)
+    LLM_SECONDS.labels(agent, model).observe(seconds)
+    if usage:
+        LLM_TOKENS.labels(agent, "prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(agent, "response").inc(response_tokens)
+        LLM_PROMPT_TOKENS.labels(agent).observe(prompt_tokens)
+
+
+def before_tool(tool, args, tool_context) -> None:
+    rows = [0]
+    _tool_rows.set(rows)
+    _begin((tool_context.invocation_id, tool_context.agent_name, tool_context.function_call_id or tool.name), rows)
+
+
+def after_tool(tool, args, tool_context, tool_response) -> None:
+    agent = tool_context.agent_name
+    started, rows = _end((tool_context.invocation_id, agent, tool_context.function_call_id or tool.name))
+    if started is None:
+        return
+    result = tool_response.get("result", tool_response) if isinstance(tool_response, dict) else tool_response
+    result_chars = len(result if isinstance(result, str) else repr(result))
+    rows_scanned = rows[0] if rows else 0
+    seconds = _add_span("tool", tool.name, started, agent=agent,
+                        args={k: _short(v) for k, v in (args or {}).items()},
+                        rows_scanned=rows_scanned, result_chars=result_chars)
+    TOOL_SECONDS.labels(tool.name).observe(seconds)
+    TOOL_ROWS.labels(tool.name).observe(rows_scanned)
+    TOOL_RESULT_CHARS.labels(tool.name).observe(result_chars)
+    if tool.name == "transfer_to_agent" and args and args.get("agent_name"):
+        TRANSFERS.labels(agent, args["agent_name"]).inc()
+        _add_span("transfer", f"{agent} -> {args['agent_name']}", time.perf_counter())
+
+
+def _with_callback(existing, callback):
+    if existing is None:
+        return callback
+    callbacks = existing if isinstance(existing, list) else [existing]
+    return callbacks if callback in callbacks else [callback] + callbacks
+
+
+def instrument(agent) -> None:
+    """Adds the timing callbacks to `agent` and all of its sub-agents."""
+    for attr, callback in (("before_agent_callback", before_agent), ("after_agent_callback", after_agent),
+                           ("before_model_callback", before_model), ("after_model_callback", after_model),
+                           ("before_tool_callback", before_tool), ("after_tool_callback", after_tool)):
+        if hasattr(agent, attr):
+            setattr(agent, attr, _with_callback(getattr(agent, attr), callback))
+    for sub_agent in agent.sub_agents:
+        instrument(sub_agent)
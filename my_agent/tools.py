@@ -1,164 +1,390 @@
-import csv
+import heapq
 import os
-from typing import List, Dict, Optional, Tuple
-from .pincode_distance import get_distance, resolve_pincode
-
-# Get directory of this file
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-INCOMING_JOBS_CSV = os.path.join(BASE_DIR, 'gig_jobs.csv')
-HISTORICAL_JOBS_CSV = os.path.join(BASE_DIR, 'historical_jobs.csv')
-PROFILES_CSV = os.path.join(BASE_DIR, 'worker_profiles.csv')
-
-def read_csv(filepath: str) -> List[Dict]:
-    try:
-        with open(filepath, mode='r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            return list(reader)
-    except FileNotFoundError:
-        return []
-
-def analyze_historical_rates(trade: str, description_keywords: str) -> str:
+from typing import Iterable, List, Optional, Sequence, Tuple
+from .pincode_distance import resolve_pincode
+from .datastore import (STORAGE_BACKEND, HistoricalJob, Job, Worker, get_jobs, get_workers,
+                        jobs_source, workers_source)
+from .cache import cached
+from .matching import MODES as MATCH_MODES, MatchResult, match
+from .rates import RateStats, get_rate_engine, tokenize
+from .similarity import get_similarity_index
+from .spatial import pincode_distances, spatial_index
+from .telemetry import record_rows
+
+# Cap on what a search tool returns to the model: results per call, and characters.
+TOOL_RESULT_LIMIT = int(os.getenv("TOOL_RESULT_LIMIT", "20"))
+TOOL_OUTPUT_CHARS = int(os.getenv("TOOL_OUTPUT_CHARS", "6000"))
+
+def _norm(text: Optional[str]) -> Optional[str]:
+    """Trade/area as the lookups compare it. Cached functions are called with
+    this too, not just keyed on it, so every spelling gets the same result."""
+    return text.strip().lower() if text is not None else None
+
+def _fmt_num(value: float) -> str:
+    """Prints whole numbers without a trailing '.0', as they appear in the CSVs."""
+    return f"{value:.0f}" if float(value).is_integer() else f"{value}"
+
+@cached(lambda trade, description_keywords, top_k=5, area=None, min_difficulty=None, max_difficulty=None: (
+    (_norm(trade), description_keywords, top_k, _norm(area), min_difficulty, max_difficulty),
+    # Ranking only depends on the set of query terms
+    (_norm(trade), frozenset(tokenize(description_keywords)), top_k, _norm(area), min_difficulty, max_difficulty)))
+def find_similar_jobs(trade: str, description_keywords: str, top_k: int = 5,
+                      area: Optional[str] = None, min_difficulty: Optional[int] = None,
+                      max_difficulty: Optional[int] = None) -> Tuple[List[HistoricalJob], int]:
+    """Most similar historical jobs (best first) and the total number of matches."""
+    index = get_similarity_index()
+    # BM25 ranking over the description index; no keywords -> general trade stats
+    ranked, total = index.search(trade, description_keywords, top_k=max(top_k, 1), area=area,
+                                 min_difficulty=min_difficulty, max_difficulty=max_difficulty)
+    record_rows(total)
+    return [index.rows[row_id] for row_id, _ in ranked], total
+
+
+def analyze_historical_rates(trade: str, description_keywords: str, top_k: int = 5,
+                             area: Optional[str] = None, min_difficulty: Optional[int] = None,
+                             max_difficulty: Optional[int] = None) -> str:
     """
     Analyzes historical jobs to estimate costs based on similarity.
+    Optionally narrow to one `area` or a difficulty range (1-10), and set how
+    many of the most similar jobs (`top_k`) the estimate is based on.
     """
-    history = read_csv(HISTORICAL_JOBS_CSV)
-    similar_jobs = []
-    
-    keywords = description_keywords.lower().split()
-    
-    for job in history:
-        # Match Trade
-        if trade.lower() in job['trade'].lower():
-            # Simple keyword matching for description similarity
-            job_desc = job['job_description'].lower()
-            match_count = sum(1 for k in keywords if k in job_desc)
-            if match_count > 0 or not keywords: # If no keywords, return general trade stats
-                job['match_score'] = match_count
-                similar_jobs.append(job)
+    top_jobs, total = find_similar_jobs(trade, description_keywords, top_k, area,
+                                        min_difficulty, max_difficulty)
                 
-    if not similar_jobs:
+    if not top_jobs:
         return f"No historical data found for {trade} matching '{description_keywords}'."
         
-    # Sort by match score
-    similar_jobs.sort(key=lambda x: x.get('match_score', 0), reverse=True)
-    top_jobs = similar_jobs[:5]
     
-    rates = [float(j['final_rate_charged']) for j in top_jobs]
+    rates = [j.final_rate_charged for j in top_jobs]
     avg_rate = sum(rates) / len(rates)
     max_rate = max(rates)
     min_rate = min(rates)
     
-    return (f"Historical Analysis for '{trade}' ({len(similar_jobs)} matches):\n"
-            f"- Avg Final Cost: ₹{avg_rate:.2f}\n"
-            f"- Range: ₹{min_rate} - ₹{max_rate}\n"
-            f"- Similar Job: {top_jobs[0]['job_description']} in {top_jobs[0].get('area', 'Unknown')} (Charged: ₹{top_jobs[0]['final_rate_charged']})")
-
-
-def _get_historical_estimate(trade: str, desc: str) -> str:
-    """Helper to get a quick rate range string for a job."""
-    # We reuse analyze logic but simplified returning just the range string
-    history = read_csv(HISTORICAL_JOBS_CSV)
-    similar_rates = []
-    keywords = desc.lower().split()
-    
-    for h in history:
-        if trade.lower() in h['trade'].lower():
-            # Check for decent overlap or just general trade stats
-            if any(k in h['job_description'].lower() for k in keywords):
-                 similar_rates.append(float(h['final_rate_charged']))
-                 
-    if not similar_rates:
-        # Fallback to all trade jobs if no keyword match
-        similar_rates = [float(h['final_rate_charged']) for h in history if trade.lower() in h['trade'].lower()]
-        
-    if not similar_rates:
+    output = (f"Historical Analysis for '{trade}' ({total} matches):\n"
+              f"- Avg Final Cost: ₹{avg_rate:.2f}\n"
+              f"- Range: ₹{min_rate} - ₹{max_rate}\n"
+              f"- Similar Job: {top_jobs[0].job_description} in {top_jobs[0].area} (Charged: ₹{_fmt_num(top_jobs[0].final_rate_charged)})")
+    trade_stats = get_rate_engine().trade_stats(trade)
+    if trade_stats:
+        output += (f"\n- All {trade} Jobs: Median ₹{trade_stats.quantile(0.5):.0f}"
+                   f" (Typical ₹{trade_stats.quantile(0.25):.0f} - ₹{trade_stats.quantile(0.75):.0f})")
+    return output
+
+
+def _format_estimate(stats: Optional[RateStats]) -> str:
+    """Quick rate range string for a job."""
+    if not stats:
         return "N/A"
-        
-    avg = sum(similar_rates) / len(similar_rates)
-    return f"₹{min(similar_rates):.0f} - ₹{max(similar_rates):.0f} (Avg: ₹{avg:.0f})"
+    return f"₹{stats.low:.0f} - ₹{stats.high:.0f} (Avg: ₹{stats.mean:.0f})"
+
+
+def _bucket_km(range_km: float) -> float:
+    """Rounds a search radius to 0.5 km so near-identical searches share a cache entry."""
+    return max(round(range_km * 2) / 2, 0.5)
+
+
+@cached(lambda category, resolved_pincode, range_km: (
+    (_norm(category), resolved_pincode, _bucket_km(range_km)),
+    (_norm(category), resolved_pincode, _bucket_km(range_km))))
+def _find_jobs(category: str, resolved_pincode: Optional[str],
+               range_km: float) -> List[Tuple[Job, Optional[float]]]:
+    # Typos: We trust the agent handles 'plumbinng' -> 'Plumber' via LLM logic usually.
+    # But let's be safe: simple substring match (served from the trade index)
+    if STORAGE_BACKEND == 'sqlite':
+        return _find_jobs_sql(category, resolved_pincode, range_km)
+    jobs = get_jobs()
+    if resolved_pincode:
+        # Distance Filter: only rows in grid cells near the pincode, nearest first
+        trade_rows = jobs.match_trade_rows(category)
+        nearby = spatial_index(jobs).within(resolved_pincode, range_km)
+        record_rows(len(nearby))
+        return [(jobs.records[i], dist) for dist, i in nearby if i in trade_rows]
+    matches = jobs.match_trade(category)
+    record_rows(len(matches))
+    return [(job, None) for job in matches]
+
+
+def _find_jobs_sql(category: str, resolved_pincode: Optional[str],
+                   range_km: float) -> List[Tuple[Job, Optional[float]]]:
+    # Same results and order as the in-memory path, with the filtering done by indexed queries
+    if not resolved_pincode:
+        rows = jobs_source.select(category)
+        record_rows(len(rows))
+        return [(job, None) for _, job in rows]
+    nearby = pincode_distances(resolved_pincode, jobs_source.pincodes(), range_km)
+    rows = jobs_source.select(category, pincodes=list(nearby))
+    record_rows(len(rows))
+    hits = sorted((nearby[job.location_zip], rowid, job) for rowid, job in rows)
+    return [(job, dist) for dist, _, job in hits]
+
+
+def find_jobs(category: str, location_query: Optional[str] = None,
+              range_km: float = 20.0) -> List[Tuple[Job, Optional[float]]]:
+    """(job, distance in km or None) for incoming jobs of a trade, nearest first
+    when a location is given. The radius is rounded to 0.5 km."""
+    resolved_pincode = resolve_pincode(location_query) if location_query else None
+    return _find_jobs(category, resolved_pincode, range_km)
+
+
+@cached(lambda jobs: ((jobs,), tuple(jobs)))
+def estimate_job_rates(jobs: Sequence[Job]) -> List[Optional[RateStats]]:
+    """Historical rate stats for each job, computed in one pass."""
+    return get_rate_engine().estimate_many((job.required_trade, job.problem_description) for job in jobs)
+
+
+_URGENCY_RANK = {"high": 0, "medium": 1, "normal": 1, "low": 2}
+JOB_SORT_KEYS = ("distance", "urgency", "rate")
+WORKER_SORT_KEYS = ("distance", "rating", "rate")
+
+
+def _top(items: Sequence, key, k: Optional[int]) -> List:
+    """The `k` smallest items by `key` (all, sorted, if k is None); ties keep
+    their original order. A heap, so ranking a long list for one page stays cheap."""
+    order = range(len(items))
+    picked = sorted(order, key=lambda i: (key(items[i]), i)) if k is None else \
+        heapq.nsmallest(k, order, key=lambda i: (key(items[i]), i))
+    return [items[i] for i in picked]
+
+
+def rank_jobs(results: Sequence[Tuple[Job, Optional[float]]], sort_by: str = "distance",
+              k: Optional[int] = None) -> List[Tuple[Job, Optional[float]]]:
+    """Top `k` search results by "distance" (the search order: nearest first),
+    "urgency" (most urgent first, then nearest) or "rate" (highest estimated
+    pay first)."""
+    if sort_by == "distance":
+        return list(results[:k])
+    if sort_by == "urgency":
+        return _top(results, lambda r: _URGENCY_RANK.get(r[0].urgency_level.lower(), 1), k)
+    if sort_by == "rate":
+        estimates = estimate_job_rates([job for job, _ in results])
+        mean = {job: stats.mean for (job, _), stats in zip(results, estimates) if stats}
+        return _top(results, lambda r: -mean.get(r[0], 0.0), k)
+    raise ValueError(f"sort_by must be one of {', '.join(JOB_SORT_KEYS)}")
+
+
+def rank_workers(available: Sequence[Tuple[Worker, float]], sort_by: Optional[str] = None,
+                 k: Optional[int] = None) -> List[Tuple[Worker, float]]:
+    """Top `k` workers by "distance" (nearest first), "rating" (best first) or
+    "rate" (cheapest first); None keeps them as listed."""
+    if sort_by is None:
+        return list(available[:k])
+    keys = {"distance": lambda a: a[1], "rating": lambda a: -a[0].rating_average,
+            "rate": lambda a: a[0].base_hourly_rate}
+    if sort_by not in keys:
+        raise ValueError(f"sort_by must be one of {', '.join(WORKER_SORT_KEYS)}")
+    return _top(available, keys[sort_by], k)
+
+
+def _render_page(header: str, blocks: Iterable[str], total: int, offset: int, max_chars: int) -> str:
+    """Header plus as many blocks as fit in `max_chars` (at least one), and a
+    note of how many results were left out."""
+    parts = [header]
+    used = len(header)
+    shown = 0
+    for block in blocks:
+        if shown and used + len(block) > max_chars:
+            break
+        parts.append(block)
+        used += len(block)
+        shown += 1
+    omitted = total - offset - shown
+    if omitted > 0:
+        parts.append(f"({omitted} more not shown; use offset={offset + shown} to see more)\n")
+    return "".join(parts)
+
+
+def _page_bounds(limit: Optional[int], offset: int) -> Tuple[int, int]:
+    limit = TOOL_RESULT_LIMIT if limit is None else max(int(limit), 1)
+    return limit, max(int(offset), 0)
 
-def search_jobs(category: str, location_query: Optional[str] = None, range_km: float = 20.0) -> str:
+
+def _job_page(results: Sequence[Tuple[Job, Optional[float]]], header: str, limit: int, offset: int,
+              sort_by: str, compact: bool, max_chars: int) -> str:
+    page = rank_jobs(results, sort_by, offset + limit)[offset:]
+    # Calculate dynamic estimates for the jobs shown in one pass
+    estimates = estimate_job_rates([job for job, _ in page])
+
+    def blocks():
+        for (job, dist), stats in zip(page, estimates):
+            dist_info = f" ({dist:.1f} km)" if dist is not None else ""
+            est_rate = _format_estimate(stats)
+            if compact:
+                yield (f"- {job.job_id} [{job.urgency_level}] {job.area} ({job.location_zip}){dist_info}"
+                       f" | {job.problem_description} | {est_rate} | {job.contact_number}\n")
+            else:
+                yield (f"- ID: {job.job_id} [{job.urgency_level} Urgency] @ {job.area} ({job.location_zip}){dist_info}\n"
+                       f"  Problem: {job.problem_description}\n"
+                       f"  Est. Rate: {est_rate}\n"
+                       f"  Contact Owner: {job.contact_number}\n")
+
+    return _render_page(header, blocks(), len(results), offset, max_chars)
+
+
+def search_jobs(category: str, location_query: Optional[str] = None, range_km: float = 20.0,
+                limit: Optional[int] = None, offset: int = 0, sort_by: str = "distance",
+                compact: bool = False) -> str:
     """
     Searches for INCOMING jobs from gig_jobs.csv.
+    Shows up to `limit` jobs starting at `offset`, ordered by `sort_by`:
+    "distance" (nearest first), "urgency" (most urgent first) or "rate"
+    (best paying first). `compact=True` gives one line per job.
     """
-    jobs = read_csv(INCOMING_JOBS_CSV)
-    results = []
-    
     if not category or not category.strip():
         return "ERROR: Missing Trade/Category."
+    if sort_by not in JOB_SORT_KEYS:
+        return f"ERROR: sort_by must be one of {', '.join(JOB_SORT_KEYS)}."
+    limit, offset = _page_bounds(limit, offset)
 
-    resolved_pincode = resolve_pincode(location_query) if location_query else None
-
-    # Typos: We trust the agent handles 'plumbinng' -> 'Plumber' via LLM logic usually.
-    # But let's be safe: simple substring match
-    
-    for job in jobs:
-        # Robust check: if 'plum' in category, match Plumber? 
-        # Better: let's rely on loose text match
-        if category.lower() in job['required_trade'].lower():
-            results.append(job)
-            
-    # Distance Filter
-    if resolved_pincode:
-        nearby_jobs = []
-        for job in results:
-            job_pincode = job.get('location_zip', '')
-            dist = get_distance(resolved_pincode, job_pincode)
-            if dist <= range_km:
-                job['distance'] = dist
-                nearby_jobs.append(job)
-        nearby_jobs.sort(key=lambda x: x['distance'])
-        results = nearby_jobs
+    results = find_jobs(category, location_query, range_km)
     
     if not results:
         return f"No incoming jobs found for {category}.do you want to search for other area?"
 
-    output = f"Incoming Jobs ({len(results)}):\n"
-    for job in results:
-        dist_info = f" ({job['distance']:.1f} km)" if 'distance' in job else ""
-        urgency = job.get('urgency_level', 'Normal')
-        area = job.get('area', 'Unknown Area')
-        contact = job.get('contact_number', 'N/A')
-        
-        # Calculate dynamic estimate
-        est_rate = _get_historical_estimate(job['required_trade'], job['problem_description'])
-        
-        output += (f"- ID: {job['job_id']} [{urgency} Urgency] @ {area} ({job['location_zip']}){dist_info}\n"
-                   f"  Problem: {job['problem_description']}\n"
-                   f"  Est. Rate: {est_rate}\n"
-                   f"  Contact Owner: {contact}\n")
-    return output
+    return _job_page(results, f"Incoming Jobs ({len(results)}):\n", limit, offset, sort_by, compact,
+                     TOOL_OUTPUT_CHARS)
+
+
+# Most searches one search_jobs_multi call will run (categories x locations).
+MAX_BATCH_SEARCHES = 12
+
+
+def search_jobs_multi(categories: List[str], location_queries: Optional[List[str]] = None,
+                      range_km: float = 20.0, limit: Optional[int] = None, sort_by: str = "distance",
+                      compact: bool = True) -> str:
+    """
+    Searches INCOMING jobs for several trades and/or areas in ONE call: every
+    category in `categories` in every area in `location_queries` (anywhere if
+    none). Shows up to `limit` jobs per search, ordered by `sort_by` as in
+    `search_jobs`. To page through one search, call `search_jobs` with its offset.
+    """
+    categories = list(dict.fromkeys(c.strip() for c in categories or () if c and c.strip()))
+    if not categories:
+        return "ERROR: Missing Trade/Category."
+    if sort_by not in JOB_SORT_KEYS:
+        return f"ERROR: sort_by must be one of {', '.join(JOB_SORT_KEYS)}."
+    locations = list(dict.fromkeys(q.strip() for q in location_queries or () if q and q.strip())) or [None]
+    searches = [(category, location) for category in categories for location in locations]
+    if len(searches) > MAX_BATCH_SEARCHES:
+        return f"ERROR: at most {MAX_BATCH_SEARCHES} category/location combinations per call."
+    limit, _ = _page_bounds(limit, 0)
+    # The output budget is shared between the searches.
+    max_chars = max(TOOL_OUTPUT_CHARS // len(searches), 500)
+
+    sections = []
+    for category, location in searches:
+        where = f" near {location}" if location else ""
+        results = find_jobs(category, location, range_km)
+        if not results:
+            sections.append(f"No incoming {category} jobs found{where}.\n")
+            continue
+        sections.append(_job_page(results, f"Incoming {category} Jobs{where} ({len(results)}):\n",
+                                  limit, 0, sort_by, compact, max_chars))
+    return "\n".join(sections)
 
 def list_all_jobs() -> str:
-    jobs = read_csv(INCOMING_JOBS_CSV)
-    output = "All Incoming Jobs:\n"
-    for job in jobs:
-        output += f"- {job['job_id']}: {job['problem_description']} ({job['required_trade']})\n"
-    return output
+    records = get_jobs().records
+    record_rows(len(records))
+    return "All Incoming Jobs:\n" + "".join(
+        f"- {job.job_id}: {job.problem_description} ({job.required_trade})\n" for job in records)
+
+def find_job(job_id: str) -> Optional[Job]:
+    wanted = job_id.strip().upper()
+    records = get_jobs().records
+    record_rows(len(records))
+    return next((job for job in records if job.job_id.upper() == wanted), None)
 
-def check_worker_availability(trade: str, pincode: str) -> str:
-    """Finds available workers for a specific trade and location."""
-    workers = read_csv(PROFILES_CSV)
+
+def describe_job(job_id: str) -> Optional[str]:
+    """One line with what the pricing and worker lookups need to know about a job."""
+    job = find_job(job_id)
+    if job is None:
+        return None
+    return (f"{job.job_id}: {job.required_trade} job at {job.area} (pincode {job.location_zip}), "
+            f"\"{job.problem_description}\", {job.urgency_level} urgency")
+
+WORKER_RANGE_KM = 15
+
+@cached(lambda trade, resolved_pincode: ((_norm(trade), resolved_pincode), (_norm(trade), resolved_pincode)))
+def find_available_workers(trade: str, resolved_pincode: str) -> List[Tuple[Worker, float]]:
+    """(worker, distance in km) for available workers of a trade within
+    WORKER_RANGE_KM, in file order."""
+    if STORAGE_BACKEND == 'sqlite':
+        nearby = pincode_distances(resolved_pincode, workers_source.pincodes(), WORKER_RANGE_KM)
+        rows = workers_source.select(trade, pincodes=[p for p, d in nearby.items() if d < WORKER_RANGE_KM],
+                                     is_available=True)
+        record_rows(len(rows))
+        return [(w, nearby[w.service_area_zip]) for _, w in rows]
+    workers = get_workers()
+    trade_rows = workers.match_trade_rows(trade)
+    nearby = spatial_index(workers).within(resolved_pincode, WORKER_RANGE_KM)
+    record_rows(len(nearby))
     available = []
-    
+    # Distance check via the grid index
+    for dist, i in sorted(nearby, key=lambda x: x[1]):
+        w = workers.records[i]
+        if dist < WORKER_RANGE_KM and i in trade_rows and w.is_available:
+            available.append((w, dist))
+    return available
+
+def check_worker_availability(trade: str, pincode: str, limit: Optional[int] = None, offset: int = 0,
+                              sort_by: Optional[str] = None, compact: bool = False) -> str:
+    """Finds available workers for a specific trade and location.
+    Shows up to `limit` workers starting at `offset`, optionally ordered by
+    `sort_by`: "rating" (best first), "distance" (nearest first) or "rate"
+    (cheapest first). `compact=True` gives one line per worker.
+    """
+    if sort_by is not None and sort_by not in WORKER_SORT_KEYS:
+        return f"ERROR: sort_by must be one of {', '.join(WORKER_SORT_KEYS)}."
+    limit, offset = _page_bounds(limit, offset)
     resolved_pincode = resolve_pincode(pincode)
     if not resolved_pincode: 
         return "Invalid location."
         
-    for w in workers:
-        if trade.lower() in w['trade'].lower() and w['is_available'] == 'True':
-             # Distance check
-            dist = get_distance(resolved_pincode, w['service_area_zip'])
-            if dist < 15:
-                w['distance'] = dist
-                available.append(w)
+    available = find_available_workers(trade, resolved_pincode)
                 
     if not available:
         return "No accessible workers available right now."
-        
-    output = f"Available {trade}s near {pincode} ({resolve_pincode(pincode) or 'Location'}):\n"
-    for w in available:
-        area = w.get('area', w['service_area_zip'])
-        output += (f"- {w['name']} ({area}) - Rating: {w['rating_average']}\n"
-                   f"  Level: {w['expertise_level']} - Rate: ₹{w['base_hourly_rate']}/hr\n")
-    return output
+
+    page = rank_workers(available, sort_by, offset + limit)[offset:]
+    if compact:
+        blocks = (f"- {w.name} ({w.area}, {dist:.1f} km) rated {w.rating_average} {w.expertise_level}"
+                  f" ₹{_fmt_num(w.base_hourly_rate)}/hr\n" for w, dist in page)
+    else:
+        blocks = (f"- {w.name} ({w.area}) - Rating: {w.rating_average}\n"
+                  f"  Level: {w.expertise_level} - Rate: ₹{_fmt_num(w.base_hourly_rate)}/hr\n" for w, _ in page)
+    return _render_page(f"Available {trade}s near {pincode} ({resolved_pincode}):\n", blocks,
+                        len(available), offset, TOOL_OUTPUT_CHARS)
+
+
+@cached(lambda trade=None, mode="greedy", max_km=WORKER_RANGE_KM: (
+    (_norm(trade), mode, float(max_km)), (_norm(trade), mode, float(max_km))))
+def match_open_jobs(trade: Optional[str] = None, mode: str = "greedy",
+                    max_km: float = WORKER_RANGE_KM) -> MatchResult:
+    """Every incoming job (of `trade`, if given) matched against the available workers."""
+    jobs, workers = get_jobs(), get_workers()
+    job_list = jobs.match_trade(trade) if trade else jobs.records
+    worker_list = workers.match_trade(trade) if trade else workers.records
+    record_rows(len(job_list) + len(worker_list))
+    return match(job_list, worker_list, mode, max_km)
+
+
+def assign_workers_to_jobs(trade: Optional[str] = None, mode: str = "greedy", max_km: float = 15.0,
+                           limit: Optional[int] = None, offset: int = 0) -> str:
+    """Matches ALL open jobs to available workers in one go (one worker per job),
+    for dispatch. Optionally only one `trade`. `mode` is "greedy" (fast) or
+    "optimal" (least total distance/best workers). Urgent jobs are served first.
+    """
+    if mode not in MATCH_MODES:
+        return f"ERROR: mode must be one of {', '.join(MATCH_MODES)}."
+    limit, offset = _page_bounds(limit, offset)
+    result = match_open_jobs(trade, mode, max_km)
+    total_jobs = len(result.assignments) + len(result.unassigned_jobs)
+    if not result.assignments:
+        return f"No jobs could be matched to an available worker within {_fmt_num(max_km)} km."
+    header = (f"Matched {len(result.assignments)} of {total_jobs} jobs ({mode}); "
+              f"{len(result.unassigned_jobs)} unassigned, {result.idle_workers} workers left idle:\n")
+    blocks = (f"- {a.job.job_id} [{a.job.urgency_level}] {a.job.required_trade} @ {a.job.area}"
+              f" -> {a.worker.name} ({a.worker.worker_id}, {a.worker.rating_average} {a.worker.expertise_level})"
+              f" {a.distance_km:.1f} km\n"
+              for a in result.assignments[offset:offset + limit])
+    return _render_page(header, blocks, len(result.assignments), offset, TOOL_OUTPUT_CHARS)
@@ -0,0 +1,158 @@
+"""
+Per-user chat sessions with bounded storage.
+
+`SessionStore` sits in front of an ADK session service and keeps track of
+every live (user_id, session_id). Sessions idle longer than the TTL, the least
+recently used ones beyond `max_sessions`, and the oldest ones while total
+history exceeds `max_bytes` are deleted from the backend.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+
+SessionKey = Tuple[str, str]
+
+
+def create_session_service(backend: Optional[str] = None) -> BaseSessionService:
+    """Session backend from config: 'memory' (default) or 'sqlite'."""
+    backend = (backend or os.getenv("SESSION_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return InMemorySessionService()
+    if backend == "sqlite":
+        from google.adk.sessions.sqlite_session_service import SqliteSessionService
+        default_path = os.path.join(os.path.dirname(__file__), "my_agent", ".adk", "chat_sessions.db")
+        return SqliteSessionService(os.getenv("SESSION_DB_PATH", default_path))
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+
+
+def _event_size(event: Event) -> int:
+    return len(event.model_dump_json(exclude_none=True))
+
+
+@dataclass
+class _Entry:
+    last_used: float
+    size_bytes: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Requests between acquire() and release(); a pinned entry is never evicted.
+    pins: int = 0
+
+
+class SessionStore:
+    """LRU + TTL + memory-capped registry of sessions in a session service."""
+
+    def __init__(self, service: BaseSessionService, app_name: str,
+                 max_sessions: int = 1000, ttl_seconds: float = 1800.0,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.service = service
+        self.app_name = app_name
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[SessionKey, _Entry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = asyncio.Lock()
+        self.evictions: Dict[str, int] = {"ttl": 0, "lru": 0, "memory": 0}
+
+    @classmethod
+    def from_env(cls, service: BaseSessionService, app_name: str) -> "SessionStore":
+        return cls(
+            service,
+            app_name,
+            max_sessions=int(os.getenv("SESSION_MAX", "1000")),
+            ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", "1800")),
+            max_bytes=int(float(os.getenv("SESSION_MAX_MB", "64")) * 1024 * 1024),
+        )
+
+    async def acquire(self, user_id: str, session_id: str) -> asyncio.Lock:
+        """Makes sure the session exists, marks it as just used and pins it
+        until `release`.
+
+        Returns the session's lock; hold it while running a turn so requests
+        for the same session are handled one at a time.
+        """
+        key = (user_id, session_id)
+        async with self._lock:
+            await self._evict_expired()
+            entry = self._entries.get(key)
+            if entry is None:
+                session = await self.service.get_session(
+                    app_name=self.app_name, user_id=user_id, session_id=session_id)
+                if session is None:
+                    await self.service.create_session(
+                        app_name=self.app_name, user_id=user_id, session_id=session_id)
+                    size = 0
+                else:
+                    # Durable backend: adopt a session left over from an earlier run.
+                    size = sum(_event_size(e) for e in session.events)
+                entry = self._entries[key] = _Entry(last_used=time.monotonic(), size_bytes=size)
+                self._total_bytes += size
+            else:
+                entry.last_used = time.monotonic()
+                self._entries.move_to_end(key)
+            # Pinned before the store lock is let go, so no other request can evict it first.
+            entry.pins += 1
+            await self._enforce_limits(keep=key)
+            return entry.lock
+
+    def release(self, user_id: str, session_id: str) -> None:
+        """Unpins a session taken with `acquire`, once its turn is recorded."""
+        entry = self._entries.get((user_id, session_id))
+        if entry is not None and entry.pins:
+            entry.pins -= 1
+
+    async def record_turn(self, user_id: str, session_id: str, events: Iterable[Event]) -> None:
+        """Adds a finished turn's events to the session's size."""
+        key = (user_id, session_id)
+        added = sum(_event_size(e) for e in events)
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.size_bytes += added
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(key)
+            self._total_bytes += added
+            await self._enforce_limits(keep=key)
+
+    async def _evict(self, key: SessionKey, reason: str) -> None:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size_bytes
+        self.evictions[reason] += 1
+        await self.service.delete_session(app_name=self.app_name, user_id=key[0], session_id=key[1])
+
+    async def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        # Entries are kept in last-used order, so expired ones are at the front.
+        for key, entry in list(self._entries.items()):
+            if entry.last_used > cutoff:
+                break
+            if not entry.pins:
+                await self._evict(key, "ttl")
+
+    async def _enforce_limits(self, keep: SessionKey) -> None:
+        for key in list(self._entries):
+            over_count = len(self._entries) > self.max_sessions
+            over_bytes = self._total_bytes > self.max_bytes
+            if not (over_count or over_bytes):
+                break
+            # Never drop the session being served or one still in use.
+            if key == keep or self._entries[key].pins:
+                continue
+            await self._evict(key, "lru" if over_count else "memory")
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "active_sessions": len(self._entries),
+            "total_bytes": self._total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": dict(self.evictions),
+        }
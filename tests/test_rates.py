@@ -0,0 +1,12 @@
+from my_agent.rates import tokenize
+
+
+def test_singular_and_plural_share_a_stem():
+    for forms in (("tile", "tiles"), ("pipe", "pipes"), ("replace", "replaced"),
+                  ("wire", "wires", "wiring"), ("leak", "leaks", "leaking", "leakage")):
+        assert len({tuple(tokenize(word)) for word in forms}) == 1, forms
+
+
+def test_short_words_keep_their_stem():
+    assert tokenize("damage garage") != tokenize("dam gar")
+    assert tokenize("damage") == tokenize("damaged")